@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rush_hour_puzzle import RushHourPuzzle
+from budget import Budget, EXCEEDED
+from main import ALGORITHMS, accepts
+
+
+# Columns of a result record (also the CSV header)
+FIELDS = ['file', 'algorithm', 'status', 'reason', 'cost', 'steps', 'time', 'best_h', 'solution', 'error']
+
+# Extra seconds a budgeted solver gets before the SIGALRM backstop fires
+ALARM_GRACE = 5
+
+
+class PuzzleTimeout(Exception):
+    """Raised inside a worker when a puzzle exceeds its time limit."""
+
+
+def _on_alarm(signum, frame):
+    raise PuzzleTimeout()
+
+
+def find_puzzles(patterns):
+    """
+    Expand directories and glob patterns into a sorted list of CSV files.
+
+    Paths and patterns that match no file are reported on stderr.
+
+    Parameters:
+    - patterns: Paths, directories (all *.csv inside) or globs such as
+      'examples/*.csv'
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*.csv')
+        matches = glob.glob(pattern)
+        if not matches:
+            print(f"Warning: no puzzle file matches '{pattern}'", file=sys.stderr)
+        files.update(matches)
+    return sorted(files)
+
+
+def solve_one(csv_file, algo_name, timeout=None, max_memory=None):
+    """
+    Solve one puzzle with one algorithm (runs in a worker process).
+
+    The solvers' progress output is discarded. Solvers that accept a
+    Budget stop by themselves at the timeout or memory ceiling (bytes)
+    and report why. A SIGALRM interval timer backs the timeout up (for
+    the other solvers, or code that does not check the budget), so it is
+    only available on platforms that have one (not on Windows).
+
+    Statuses: 'solved', 'unsolvable' (search space exhausted),
+    'budget_exceeded' (with the reason: 'deadline', 'memory' or
+    'max_nodes'), 'unsolved' (no answer from a solver without a budget)
+    and 'error'.
+
+    Returns: Result record (dictionary with the FIELDS keys)
+    """
+    record = dict.fromkeys(FIELDS)
+    record.update({'file': csv_file, 'algorithm': algo_name})
+
+    algo_config = ALGORITHMS[algo_name]
+    function = algo_config['function']
+    heuristic = algo_config['heuristic']
+    options = algo_config.get('options', {})
+
+    budget = None
+    if (timeout or max_memory) and accepts(function, 'budget'):
+        budget = Budget(time_limit=timeout, max_memory=max_memory)
+        options = dict(options, budget=budget)
+
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout + ALARM_GRACE if budget else timeout)
+
+    start_time = time.time()
+    try:
+        # Strict loading raises on a missing or malformed file instead of
+        # printing the error and carrying on with a partial puzzle
+        puzzle = RushHourPuzzle(csv_file=csv_file, strict=True)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            if heuristic:
+                solution, steps = function(puzzle, heuristic, **options)
+            else:
+                solution, steps = function(puzzle, **options)
+
+        record['steps'] = steps
+        if solution:
+            record['status'] = 'solved'
+            record['cost'] = solution.g
+            record['solution'] = solution.getSolution()
+        elif budget is not None:
+            record['status'] = budget.status
+            record['reason'] = budget.reason
+            record['best_h'] = budget.best_h
+        else:
+            record['status'] = 'unsolved'
+
+    except PuzzleTimeout:
+        record['status'] = EXCEEDED
+        record['reason'] = 'deadline'
+
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    record['time'] = round(time.time() - start_time, 4)
+    return record
+
+
+class RecordWriter:
+    """Stream result records to a file as JSON Lines or CSV."""
+
+    def __init__(self, file, output_format='jsonl'):
+        self.file = file
+        self.output_format = output_format
+        if output_format == 'csv':
+            self.writer = csv.DictWriter(file, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        if self.output_format == 'csv':
+            row = dict(record)
+            if row['solution'] is not None:
+                row['solution'] = json.dumps(row['solution'])
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+
+def run_batch(csv_files, algo_names, writer, workers=None, timeout=None, max_memory=None):
+    """
+    Solve every (puzzle, algorithm) pair across a process pool, writing
+    each record as soon as it finishes.
+
+    Returns: Dictionary status -> number of records
+    """
+    summary = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_one, csv_file, algo_name, timeout, max_memory)
+                   for csv_file in csv_files
+                   for algo_name in algo_names]
+
+        for future in as_completed(futures):
+            record = future.result()
+            writer.write(record)
+            summary[record['status']] = summary.get(record['status'], 0) + 1
+
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Solve Rush Hour puzzles in parallel, without prompts.")
+    parser.add_argument('puzzles', nargs='+',
+                        help="CSV files, directories or globs (e.g. 'examples/*.csv')")
+    parser.add_argument('-a', '--algorithm', action='append', dest='algorithms',
+                        choices=list(ALGORITHMS), metavar='NAME',
+                        help="Algorithm from main.ALGORITHMS (repeatable, default: 'A* (h2)')")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument('-t', '--timeout', type=float, default=None,
+                        help="Time limit per puzzle and algorithm, in seconds")
+    parser.add_argument('-m', '--max-memory', type=float, default=None,
+                        help="Memory ceiling per puzzle and algorithm, in MB (estimated "
+                             "from the search's stored states)")
+    parser.add_argument('-f', '--format', choices=['jsonl', 'csv'], default='jsonl',
+                        help="Output format (default: jsonl)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="Output file (default: stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # Example:
+    #   python src/batch.py 'examples/*.csv' -a 'A* (h2)' -a BFS -t 30 -o results.jsonl
+    args = parse_args(argv)
+    algo_names = args.algorithms or ['A* (h2)']
+
+    csv_files = find_puzzles(args.puzzles)
+    if not csv_files:
+        print("No puzzle files found", file=sys.stderr)
+        return 1
+
+    if args.timeout and not hasattr(signal, 'setitimer'):
+        print("Warning: per-puzzle timeout is not supported on this platform",
+              file=sys.stderr)
+
+    print(f"Solving {len(csv_files)} puzzle(s) with {', '.join(algo_names)}",
+          file=sys.stderr)
+    start_time = time.time()
+    max_memory = int(args.max_memory * 1024 * 1024) if args.max_memory else None
+
+    if args.output == '-':
+        summary = run_batch(csv_files, algo_names, RecordWriter(sys.stdout, args.format),
+                            args.workers, args.timeout, max_memory)
+    else:
+        with open(args.output, 'w', newline='') as file:
+            summary = run_batch(csv_files, algo_names, RecordWriter(file, args.format),
+                                args.workers, args.timeout, max_memory)
+
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(summary.items()))
+    print(f"Done in {time.time() - start_time:.2f}s: {counts}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
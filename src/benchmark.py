@@ -0,0 +1,337 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from rush_hour_puzzle import RushHourPuzzle
+from retrograde import DistanceTable
+from batch import find_puzzles
+from main import ALGORITHMS
+
+
+# Default locations of the run history and of the reference run
+HISTORY_PATH = "./benchmarks/history.json"
+BASELINE_PATH = "./benchmarks/baseline.json"
+
+# Time differences below this (seconds) are noise, never regressions
+TIME_SLACK = 0.01
+
+
+class BenchmarkTimeout(Exception):
+    """Raised when one run exceeds its time limit."""
+
+
+def _on_alarm(signum, frame):
+    raise BenchmarkTimeout()
+
+
+def hardest_puzzles(puzzles, table_dir='./tables'):
+    """
+    Generate harder puzzles from the given ones: for each puzzle's
+    cluster, the state farthest from the goal (ties broken by packed
+    key, so the choice is reproducible). Only states farther than the
+    original puzzle are kept.
+
+    Distance tables are loaded from (or saved to) table_dir like
+    retrograde_solve does, so only the first run pays for building them.
+
+    Parameters:
+    - puzzles: List of (name, RushHourPuzzle)
+
+    Returns: List of (name, RushHourPuzzle) for the generated puzzles
+    """
+    generated = []
+    for name, puzzle in puzzles:
+        table = None
+        if table_dir:
+            table, _ = DistanceTable.find(table_dir, puzzle)
+
+        if table is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                table, _ = DistanceTable.build(puzzle)
+            if table_dir and table.distances:
+                os.makedirs(table_dir, exist_ok=True)
+                table.save(os.path.join(table_dir, table.file_name()))
+
+        original = table.distance(puzzle)
+        if original is None or not table.distances:
+            continue
+        key = max(table.distances, key=lambda k: (table.distances[k], -k))
+        if table.distances[key] > original:
+            spec = table.spec
+            generated.append((f"{name} (hardest)", spec.decode(spec.unpack(key))))
+    return generated
+
+
+def run_once(puzzle, algo_config, timeout=None):
+    """
+    Solve a puzzle once with an ALGORITHMS entry, its output discarded.
+
+    Returns: (solution Node or None, steps, elapsed seconds)
+    Raises BenchmarkTimeout if the run exceeds timeout seconds.
+    """
+    function = algo_config['function']
+    heuristic = algo_config['heuristic']
+    options = algo_config.get('options', {})
+
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            if heuristic:
+                solution, steps = function(puzzle, heuristic, **options)
+            else:
+                solution, steps = function(puzzle, **options)
+            elapsed_time = time.perf_counter() - start_time
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return solution, steps, elapsed_time
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def benchmark(name, puzzle, algo_name, warmup=1, repeat=5, timeout=None, memory=True):
+    """
+    Benchmark one algorithm on one puzzle.
+
+    Warmup runs are not measured (they also build the on-disk tables and
+    pattern databases some solvers use). Peak memory comes from one extra
+    run under tracemalloc, since tracing slows the search down; it only
+    sees the current process (not HDA*'s workers).
+
+    Returns: Result dictionary (puzzle, algorithm, status, cost, nodes,
+    runs, median/p95/min time, nodes_per_sec, peak_memory)
+    """
+    algo_config = ALGORITHMS[algo_name]
+    result = {
+        'puzzle': name,
+        'algorithm': algo_name,
+        'status': 'solved',
+        'cost': None,
+        'nodes': None,
+        'runs': 0,
+        'median': None,
+        'p95': None,
+        'min': None,
+        'nodes_per_sec': None,
+        'peak_memory': None
+    }
+
+    times = []
+    try:
+        for run in range(warmup + repeat):
+            solution, steps, elapsed_time = run_once(puzzle, algo_config, timeout)
+            if solution is None:
+                result['status'] = 'unsolved'
+                result['nodes'] = steps
+                return result
+            if run >= warmup:
+                times.append(elapsed_time)
+        result['cost'] = solution.g
+        result['nodes'] = steps
+
+        if memory:
+            tracemalloc.start()
+            try:
+                run_once(puzzle, algo_config, timeout)
+                _, result['peak_memory'] = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+    except BenchmarkTimeout:
+        result['status'] = 'timeout'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+
+    if times:
+        result['runs'] = len(times)
+        result['median'] = statistics.median(times)
+        result['p95'] = percentile(times, 0.95)
+        result['min'] = min(times)
+        if result['median'] > 0 and result['nodes'] is not None:
+            result['nodes_per_sec'] = result['nodes'] / result['median']
+    return result
+
+
+def git_commit():
+    """Returns the current git commit hash, or None outside a repository."""
+    try:
+        output = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True)
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def save_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=1)
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Compare results with a baseline run, matching (puzzle, algorithm).
+
+    A regression is: a puzzle no longer solved, a higher cost, or median
+    time, nodes or peak memory growing by more than `threshold` (time
+    also by more than TIME_SLACK seconds).
+
+    Returns: List of regression descriptions (empty if none)
+    """
+    previous = {(r['puzzle'], r['algorithm']): r for r in baseline['results']}
+    regressions = []
+
+    for result in results:
+        label = f"{result['algorithm']} on {result['puzzle']}"
+        old = previous.get((result['puzzle'], result['algorithm']))
+        if old is None or old['status'] != 'solved':
+            continue
+        if result['status'] != 'solved':
+            regressions.append(f"{label}: {result['status']} (was solved)")
+            continue
+
+        if result['cost'] > old['cost']:
+            regressions.append(f"{label}: cost {old['cost']} -> {result['cost']}")
+        if result['nodes'] > old['nodes'] * (1 + threshold):
+            regressions.append(f"{label}: nodes {old['nodes']:,} -> {result['nodes']:,}")
+        if (result['median'] > old['median'] * (1 + threshold)
+                and result['median'] - old['median'] > TIME_SLACK):
+            regressions.append(f"{label}: median time {old['median']:.4f}s -> {result['median']:.4f}s")
+        if (result['peak_memory'] is not None and old.get('peak_memory') is not None
+                and result['peak_memory'] > old['peak_memory'] * (1 + threshold)):
+            regressions.append(f"{label}: peak memory {old['peak_memory'] / 1024:,.0f} KB -> "
+                               f"{result['peak_memory'] / 1024:,.0f} KB")
+    return regressions
+
+
+def print_result(result):
+    def number(value, fmt):
+        return format(value, fmt) if value is not None else "-"
+
+    memory = result['peak_memory'] / 1024 if result['peak_memory'] is not None else None
+    print(f"{result['puzzle'][:20]:<21} {result['algorithm'][:22]:<23} {result['status']:<9} "
+          f"{number(result['cost'], ''):<6} {number(result['nodes'], ','):<10} "
+          f"{number(result['median'], '.4f'):<10} {number(result['p95'], '.4f'):<10} "
+          f"{number(result['nodes_per_sec'], ',.0f'):<10} {number(memory, ',.0f'):<10}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every algorithm on the example puzzles and track regressions.")
+    parser.add_argument('puzzles', nargs='*', default=['examples'],
+                        help="CSV files, directories or globs (default: examples)")
+    parser.add_argument('-a', '--algorithm', action='append', dest='algorithms',
+                        choices=list(ALGORITHMS), metavar='NAME',
+                        help="Algorithm from main.ALGORITHMS (repeatable, default: all)")
+    parser.add_argument('--no-generated', action='store_true',
+                        help="Skip the generated hardest state of each puzzle's cluster")
+    parser.add_argument('--warmup', type=int, default=1, help="Unmeasured runs (default: 1)")
+    parser.add_argument('--repeat', type=int, default=5, help="Measured runs (default: 5)")
+    parser.add_argument('-t', '--timeout', type=float, default=60,
+                        help="Time limit per run, in seconds (default: 60)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the tracemalloc run (peak memory)")
+    parser.add_argument('--history', default=HISTORY_PATH,
+                        help=f"JSON file the run is appended to (default: {HISTORY_PATH})")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help=f"Run to compare against, if the file exists (default: {BASELINE_PATH})")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Save this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative growth counted as a regression (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # Example:
+    #   python src/benchmark.py -a 'A* (h2)' -a 'A* (h5)' --repeat 3
+    args = parse_args(argv)
+    algo_names = args.algorithms or list(ALGORITHMS)
+
+    csv_files = find_puzzles(args.puzzles)
+    if not csv_files:
+        print("No puzzle files found", file=sys.stderr)
+        return 1
+
+    puzzles = [(os.path.basename(csv_file), RushHourPuzzle(csv_file=csv_file)) for csv_file in csv_files]
+    if not args.no_generated:
+        print("Generating the hardest state of each cluster...")
+        puzzles += hardest_puzzles(puzzles)
+
+    print(f"\n{'Puzzle':<21} {'Algorithm':<23} {'Status':<9} {'Moves':<6} {'Nodes':<10} "
+          f"{'Median (s)':<10} {'p95 (s)':<10} {'Nodes/s':<10} {'Peak KB':<10}")
+    print("-" * 115)
+
+    results = []
+    for name, puzzle in puzzles:
+        for algo_name in algo_names:
+            result = benchmark(name, puzzle, algo_name, args.warmup, args.repeat,
+                               args.timeout, not args.no_memory)
+            print_result(result)
+            results.append(result)
+
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'warmup': args.warmup,
+        'repeat': args.repeat,
+        'results': results
+    }
+
+    history = load_json(args.history, [])
+    history.append(run)
+    save_json(args.history, history)
+    print(f"\nRun appended to {args.history} ({len(history)} run(s))")
+
+    status = 0
+    baseline = load_json(args.baseline, None)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) against {args.baseline} "
+                  f"(threshold {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"  • {regression}")
+            status = 1
+        else:
+            print(f"\n✓ No regression against {args.baseline}")
+
+    if args.update_baseline:
+        save_json(args.baseline, run)
+        print(f"Baseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
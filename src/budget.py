@@ -0,0 +1,102 @@
+import time
+import tracemalloc
+
+
+# Outcomes of a budgeted search (Budget.status)
+SOLVED = 'solved'
+EXCEEDED = 'budget_exceeded'
+UNSOLVABLE = 'unsolvable'
+
+# Estimated bytes per stored state (packed key in a set or dict, plus its
+# share of the open list and search tree; 100-170 measured with
+# tracemalloc on the examples), used when memory is measured
+# from the search's structures rather than with tracemalloc
+BYTES_PER_ENTRY = 150
+
+
+class Budget:
+    """
+    Wall-clock and memory limits for one search, and its outcome.
+
+    A solver given a Budget calls start() when it begins, asks exceeded()
+    every `interval` expansions (or once per layer / batch) and stops
+    cleanly when it answers. The solver still returns (goal_node, steps);
+    the budget then describes how it ended:
+
+    - status: SOLVED, EXCEEDED or UNSOLVABLE (search space exhausted)
+    - reason: why the budget ran out ('deadline', 'memory', 'max_nodes')
+    - best_node: best partial result when stopped, e.g. the node with the
+      lowest h seen (a Node chain from the initial state), or None
+    - best_h: heuristic value of best_node, if the solver has one
+    - elapsed: seconds between start() and the end of the search
+
+    Memory is the number of stored states times bytes_per_entry, unless
+    use_tracemalloc is set (exact, but tracing slows the search down), or
+    the solver measures it itself (e.g. NumPy array sizes).
+    """
+
+    def __init__(self, time_limit=None, max_memory=None, interval=1000,
+                 bytes_per_entry=BYTES_PER_ENTRY, use_tracemalloc=False):
+        """
+        Parameters:
+        - time_limit: Seconds the search may run (None: no limit)
+        - max_memory: Bytes the search may use (None: no limit)
+        - interval: Expansions between two checks
+        - bytes_per_entry: Estimated size of one stored state
+        - use_tracemalloc: Measure memory with tracemalloc
+        """
+        self.time_limit = time_limit
+        self.max_memory = max_memory
+        self.interval = interval
+        self.bytes_per_entry = bytes_per_entry
+        self.use_tracemalloc = use_tracemalloc
+        self.deadline = None
+        self.start_time = None
+        self.owns_tracing = False
+        self.status = None
+        self.reason = None
+        self.best_node = None
+        self.best_h = None
+        self.elapsed = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + self.time_limit if self.time_limit is not None else None
+        self.status = self.reason = self.best_node = self.best_h = self.elapsed = None
+        if self.use_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracing = True
+
+    def exceeded(self, entries=0, memory=None):
+        """
+        Check the limits.
+
+        Parameters:
+        - entries: Number of states the search currently stores
+        - memory: Bytes the search measured itself (overrides entries)
+
+        Returns: 'deadline' or 'memory' if a limit is exceeded, else None
+        """
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            return 'deadline'
+        if self.max_memory is not None:
+            if memory is None:
+                if self.use_tracemalloc:
+                    memory = tracemalloc.get_traced_memory()[0]
+                else:
+                    memory = entries * self.bytes_per_entry
+            if memory > self.max_memory:
+                return 'memory'
+        return None
+
+    def finish(self, status, reason=None, best_node=None, best_h=None):
+        """Record how the search ended."""
+        self.status = status
+        self.reason = reason
+        self.best_node = best_node
+        self.best_h = best_h
+        if self.start_time is not None:
+            self.elapsed = time.perf_counter() - self.start_time
+        if self.owns_tracing:
+            tracemalloc.stop()
+            self.owns_tracing = False
@@ -0,0 +1,275 @@
+import heapq
+import os
+import tempfile
+from array import array
+
+from puzzle_spec import make_spec
+from budget import SOLVED, EXCEEDED, UNSOLVABLE
+
+
+# Keys read from or written to a layer file at a time
+IO_CHUNK = 1 << 16
+
+
+def read_keys(path):
+    """Stream the packed keys of a layer or run file, in file order."""
+    with open(path, 'rb') as file:
+        while True:
+            chunk = array('Q')
+            try:
+                chunk.fromfile(file, IO_CHUNK)
+            except EOFError:
+                # Last (partial) chunk: fromfile keeps what it could read
+                pass
+            if not chunk:
+                return
+            yield from chunk
+
+
+class KeyWriter:
+    """Buffered writer of packed keys to a binary file of uint64."""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.buffer = array('Q')
+        self.count = 0
+
+    def write(self, key):
+        self.buffer.append(key)
+        self.count += 1
+        if len(self.buffer) >= IO_CHUNK:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        self.buffer = array('Q')
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def contains(path, key):
+    """Binary search for a key in a sorted layer file, reading 8 bytes per probe."""
+    item_size = array('Q').itemsize
+    with open(path, 'rb') as file:
+        low = 0
+        high = os.path.getsize(path) // item_size
+        while low < high:
+            middle = (low + high) // 2
+            file.seek(middle * item_size)
+            value = array('Q', file.read(item_size))[0]
+            if value == key:
+                return True
+            if value < key:
+                low = middle + 1
+            else:
+                high = middle
+    return False
+
+
+def difference(keys, exclude):
+    """
+    Stream the keys of a sorted iterable that are not in another sorted
+    iterable (both read once, in order).
+    """
+    exclude = iter(exclude)
+    current = next(exclude, None)
+    for key in keys:
+        while current is not None and current < key:
+            current = next(exclude, None)
+        if current != key:
+            yield key
+
+
+def unique(keys):
+    """Drop repeated keys from a sorted iterable."""
+    previous = None
+    for key in keys:
+        if key != previous:
+            yield key
+            previous = key
+
+
+def external_BFS(initial_state, work_dir=None, buffer_size=1000000,
+                 engine='grid', slides=False, telemetry=None, budget=None):
+    """
+    External-memory BFS: memory use is bounded by buffer_size, the state
+    space lives on disk.
+
+    Every BFS layer is a file of sorted packed keys (uint64). A layer is
+    expanded by streaming it; children are collected in a buffer of at
+    most buffer_size keys, which is sorted and written out as a run when
+    full. The runs are then merged, deduplicated and filtered against the
+    current and previous layer (moves are reversible, so a child of
+    layer d can only already be in layer d - 1 or d) into the next layer.
+
+    The path is recovered backwards from the goal: among the goal's
+    neighbours, a binary search of the previous layer's file finds its
+    predecessor, and so on down to the start.
+
+    Parameters:
+    - initial_state: RushHourPuzzle instance
+    - work_dir: Directory for the layer files (a temporary directory
+      inside it is removed at the end; default: system temp dir)
+    - buffer_size: Maximum number of child keys held in memory
+    - engine: Move generator, 'grid' or 'bitboard'
+    - slides: Count any multi-cell slide as a single action
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py),
+      at most one per layer, once `interval` expansions have passed since
+      the previous one; f and g are the layer's depth
+    - budget: Budget limiting time and memory (see budget.py; memory is the
+      child buffer); when it runs out, its best_node leads to the state
+      being expanded (in the deepest layer reached)
+
+    Returns:
+    - goal_node: Node containing the goal state, or None
+    - steps: Number of states expanded
+    """
+    spec = make_spec(initial_state, engine, slides)
+    if max(spec.board_width, spec.board_height).bit_length() * len(spec.ids) > 64:
+        raise ValueError("Puzzle too large for 64-bit packed states")
+
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
+
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+
+    # Expansion count of the next snapshot
+    report_at = 0
+    if telemetry is not None:
+        telemetry.start("BFS (external)")
+        report_at = telemetry.interval
+
+    if spec.is_goal(start):
+        print("BFS (external): Initial state is goal!")
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return spec.materialize(spec.replay(start, [])), 0
+
+    with tempfile.TemporaryDirectory(prefix='rush_hour_bfs_', dir=work_dir) as directory:
+        def layer_path(depth):
+            return os.path.join(directory, f"layer_{depth}.bin")
+
+        def walk_back(key, depth):
+            """
+            Actions from the start to a state of layer `depth`: the
+            predecessor of a state in layer d is a neighbour that is
+            stored in layer d - 1.
+            """
+            actions = []
+            for previous in range(depth - 1, -1, -1):
+                for action, _ in spec.successors(spec.unpack(key)):
+                    neighbour = spec.next_key(key, action)
+                    if contains(layer_path(previous), neighbour):
+                        actions.append(spec.inverse(action))
+                        key = neighbour
+                        break
+                else:
+                    raise ValueError(f"Layer {previous} has no predecessor of a layer {previous + 1} state")
+            actions.reverse()
+            return actions
+
+        writer = KeyWriter(layer_path(0))
+        writer.write(start_key)
+        writer.close()
+
+        depth = 0
+        steps = 0
+        generated = 0
+        known = 1  # States in all layer files
+        frontier_size = 1
+        goal_key = None
+        reason = None
+
+        def snapshot():
+            # Successors that did not make it into a layer were duplicates
+            return (steps, generated, generated - (known - 1),
+                    frontier_size, known - frontier_size, depth, depth)
+        while goal_key is None:
+            # Expand layer `depth` into sorted runs
+            runs = []
+            buffer = set()
+
+            def write_run():
+                run = KeyWriter(os.path.join(directory, f"run_{len(runs)}.bin"))
+                for key in sorted(buffer):
+                    run.write(key)
+                run.close()
+                runs.append(run.file.name)
+                buffer.clear()
+
+            for key in read_keys(layer_path(depth)):
+                if steps == check_at:
+                    check_at += budget.interval
+                    reason = budget.exceeded(len(buffer))
+                    if reason:
+                        break
+                steps += 1
+                successors = spec.successors(spec.unpack(key))
+                generated += len(successors)
+                for action, _ in successors:
+                    buffer.add(spec.next_key(key, action))
+                if len(buffer) >= buffer_size:
+                    write_run()
+            if reason:
+                print(f"BFS (external): Budget exceeded ({reason}) after {steps} steps")
+                if telemetry is not None:
+                    telemetry.finish(EXCEEDED, *snapshot())
+                partial = spec.replay(start, walk_back(key, depth))
+                budget.finish(EXCEEDED, reason, spec.materialize(partial))
+                return None, steps
+
+            if buffer:
+                write_run()
+
+            if not runs:
+                break
+
+            # Merge the runs into the next layer
+            children = unique(heapq.merge(*(read_keys(run) for run in runs)))
+            children = difference(children, read_keys(layer_path(depth)))
+            if depth > 0:
+                children = difference(children, read_keys(layer_path(depth - 1)))
+
+            writer = KeyWriter(layer_path(depth + 1))
+            for key in children:
+                writer.write(key)
+                if goal_key is None and spec.is_goal(spec.unpack(key)):
+                    goal_key = key
+            writer.close()
+
+            for run in runs:
+                os.remove(run)
+
+            if writer.count == 0:
+                break
+            depth += 1
+            known += writer.count
+            frontier_size = writer.count
+            if telemetry is not None and steps >= report_at:
+                telemetry.update(*snapshot())
+                report_at = steps + telemetry.interval
+
+        if goal_key is None:
+            print("BFS (external): No solution found!")
+            if telemetry is not None:
+                telemetry.finish('unsolved', *snapshot())
+            if budget is not None:
+                budget.finish(UNSOLVABLE)
+            return None, steps
+
+        actions = walk_back(goal_key, depth)
+
+    print(f"BFS (external): Solution in {steps} steps!")
+    if telemetry is not None:
+        telemetry.finish('solved', *snapshot())
+    if budget is not None:
+        budget.finish(SOLVED)
+    return spec.materialize(spec.replay(start, actions)), steps
@@ -3,9 +3,11 @@ import sys
 import time
 import math
 
+from solution_path import SolutionPath
+
 class RushHourGame:
     
-    def __init__(self, initial_state, solution_node=None, algorithm_name="", steps=0):
+    def __init__(self, initial_state, actions=None, algorithm_name="", steps=0):
         pygame.init()
         
         # Game settings 
@@ -49,22 +51,14 @@ class RushHourGame:
         self.font_info = pygame.font.Font(None, 20)  
         self.font_vehicle = pygame.font.Font(None, 24) 
         
-        # Solution data
-        self.solution_node = solution_node
+        # Solution data: states are replayed from the actions on demand
+        self.actions = list(actions) if actions else []
         self.algorithm_name = algorithm_name
         self.steps = steps
         
         # Animation
         self.current_state_index = 0
-        self.path = []
-        self.actions = []
-        
-        if solution_node:
-            self.path = solution_node.getPath()
-            self.actions = solution_node.getSolution()
-        else:
-            self.path = [initial_state]
-            self.actions = []
+        self.path = SolutionPath(initial_state, self.actions)
         
         self.animating = False
         self.animation_speed = 0.5
@@ -262,8 +256,8 @@ class RushHourGame:
                                   self.MARGIN + 12, stats_y)
         
         # Right column
-        if self.solution_node:
-            cost = self.solution_node.g
+        if self.actions:
+            cost = len(self.actions)
             cost_x = self.WINDOW_WIDTH // 2 + 10
             self.draw_text_with_shadow(f"Cost: {cost} moves", 
                                       self.font_info, self.TEXT_COLOR, 
@@ -352,7 +346,7 @@ class RushHourGame:
         pygame.quit()
 
 
-def visualize_solution(initial_state, solution_node, algorithm_name, steps):
-    """Create and run the visualization."""
-    game = RushHourGame(initial_state, solution_node, algorithm_name, steps)
+def visualize_solution(initial_state, actions, algorithm_name, steps):
+    """Create and run the visualization of a solution's action list."""
+    game = RushHourGame(initial_state, actions, algorithm_name, steps)
     game.run()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import argparse
+import contextlib
+import glob
+import io
+import time
+
+from rush_hour_puzzle import RushHourPuzzle
+from search_algorithms import (A_star, heuristic_h1, heuristic_h2, heuristic_h3,
+                               heuristic_h4, heuristic_h5)
+
+
+# (name, heuristic, admissible)
+HEURISTICS = [
+    ('h1', heuristic_h1, True),
+    ('h2', heuristic_h2, True),
+    ('h3', heuristic_h3, False),
+    ('h4', heuristic_h4, True),
+    ('h5', heuristic_h5, True)
+]
+
+
+def reduction(steps, reference):
+    """Percentage of expansions saved compared to a reference count."""
+    return f"{(reference - steps) / reference * 100:+.1f}%" if reference else "N/A"
+
+
+def main():
+    # Example:
+    #   python src/heuristic_report.py
+    parser = argparse.ArgumentParser(
+        description="Compare A* expansions of each heuristic against h1 and h2.")
+    parser.add_argument('puzzles', nargs='*', default=['examples/*.csv'],
+                        help="CSV files or globs (default: examples/*.csv)")
+    args = parser.parse_args()
+
+    csv_files = sorted({path for pattern in args.puzzles for path in glob.glob(pattern)})
+
+    print(f"\n{'Puzzle':<14} {'h':<4} {'Adm.':<5} {'Moves':<7} {'Nodes':<10} "
+          f"{'vs h1':<9} {'vs h2':<9} {'Time (s)':<9}")
+    print("-" * 72)
+    totals = {name: 0 for name, _, _ in HEURISTICS}
+    for csv_file in csv_files:
+        puzzle = RushHourPuzzle(csv_file=csv_file)
+        name = csv_file.replace('\\', '/').split('/')[-1]
+        steps_by_heuristic = {}
+        for h_name, heuristic_function, admissible in HEURISTICS:
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                solution, steps = A_star(puzzle, heuristic_function)
+            elapsed_time = time.perf_counter() - start_time
+            steps_by_heuristic[h_name] = steps
+            totals[h_name] += steps
+
+            cost = solution.g if solution else "-"
+            print(f"{name:<14} {h_name:<4} {'yes' if admissible else 'no':<5} {cost!s:<7} "
+                  f"{steps:<10,} {reduction(steps, steps_by_heuristic['h1']):<9} "
+                  f"{reduction(steps, steps_by_heuristic['h2']) if 'h2' in steps_by_heuristic else '':<9} "
+                  f"{elapsed_time:<9.3f}")
+        print()
+
+    print("Total expansions:")
+    for h_name, _, admissible in HEURISTICS:
+        note = "" if admissible else " (inadmissible: cost not guaranteed optimal)"
+        print(f"  {h_name}: {totals[h_name]:,} ({reduction(totals[h_name], totals['h1'])} vs h1, "
+              f"{reduction(totals[h_name], totals['h2'])} vs h2){note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,75 @@
 from rush_hour_puzzle import RushHourPuzzle
-from search_algorithms import BFS, A_star, heuristic_h1, heuristic_h2, heuristic_h3
-from game_interface import visualize_solution
+from search_algorithms import (BFS, bidirectional_BFS, A_star, ARA_star, IDA_star, heuristic_h1, heuristic_h2,
+                               heuristic_h3, heuristic_h5)
+from external_bfs import external_BFS
+from parallel_search import HDA_star
+from vectorized_bfs import vectorized_BFS, NUMPY_AVAILABLE
+from retrograde import retrograde_solve
+from pattern_database import heuristic_pdb
+from solution_cache import SolutionCache
+from telemetry import PrintTelemetry
+from profiler import PhaseProfiler
+import contextlib
+import inspect
+import io
+import json
+import multiprocessing
+import queue
+import re
+import signal
 import time
 import os
+import sys
+
+
+# Persistent solution cache (bypass with --no-cache)
+CACHE_PATH = "./.solution_cache.sqlite"
+CACHE_MAX_ENTRIES = 1000
+
+# Expansions between two progress lines of the searches that report them
+TELEMETRY_INTERVAL = 1000
+
+# Where --profile=full writes one report per algorithm
+PROFILE_DIR = "./profiles"
 
 
 # ALGORITHM CONFIGURATION
 
 # Easy to add new algorithms - just add to this dictionary!
+# 'optimal' marks algorithms whose answer is guaranteed to be a minimum number
+# of single-cell moves: exact searches, or A* variants with an admissible
+# heuristic (the portfolio's 'first' policy stops at the first of these).
 ALGORITHMS = {
     'BFS': {
         'name': 'BFS',
         'description': 'Breadth-First Search (uninformed)',
         'function': BFS,
         'heuristic': None,
+        'optimal': True,
         'note': 'May be slow on complex puzzles'
     },
+    'BFS (bidirectional)': {
+        'name': 'BFS (bidirectional)',
+        'description': 'BFS from the start and from all goal states, meeting in the middle',
+        'function': bidirectional_BFS,
+        'heuristic': None,
+        'optimal': True,
+        'note': 'Optimal; no 100000-node cap like BFS, but no faster on small clusters'
+    },
+    'BFS (external memory)': {
+        'name': 'BFS (external memory)',
+        'description': 'Layered BFS keeping every layer as a sorted key file on disk',
+        'function': external_BFS,
+        'heuristic': None,
+        'optimal': True,
+        'note': 'Memory stays bounded; limited by disk space instead'
+    },
     'A* (h1)': {
         'name': 'A* (h1)',
         'description': 'A* with h1: distance to exit',
         'function': A_star,
         'heuristic': heuristic_h1,
+        'optimal': True,
         'note': 'Simple admissible heuristic'
     },
     'A* (h2)': {
@@ -28,6 +77,7 @@ ALGORITHMS = {
         'description': 'A* with h2: h1 + blocking vehicles',
         'function': A_star,
         'heuristic': heuristic_h2,
+        'optimal': True,
         'note': 'More informed than h1'
     },
     'A* (h3)': {
@@ -35,12 +85,123 @@ ALGORITHMS = {
         'description': 'A* with h3: h2 + secondary blockers',
         'function': A_star,
         'heuristic': heuristic_h3,
-        'note': 'Most sophisticated heuristic'
+        'optimal': False,
+        'note': 'Most sophisticated heuristic, but not admissible (may overestimate)'
+    },
+    'A* (h5)': {
+        'name': 'A* (h5)',
+        'description': 'A* with h5: h1 + moves to clear each blocker + blockers of blockers',
+        'function': A_star,
+        'heuristic': heuristic_h5,
+        'optimal': True,
+        'note': 'Admissible (unlike h3); fewer nodes, but each evaluation costs more'
+    },
+    'A* (PDB)': {
+        'name': 'A* (PDB)',
+        'description': 'A* with additive pattern databases (X + groups of vehicles along the blocker chains), cached per layout in ./pdbs',
+        'function': A_star,
+        'heuristic': heuristic_pdb,
+        'optimal': True,
+        'note': 'Admissible; the databases take a few seconds to build on first use of a layout, then load from disk'
+    },
+    'Weighted A* (h2, w=2)': {
+        'name': 'Weighted A* (h2, w=2)',
+        'description': 'Weighted A* with h2: f = g + 2h, far fewer nodes than A*',
+        'function': A_star,
+        'heuristic': heuristic_h2,
+        'options': {'weight': 2},
+        'optimal': False,
+        'note': 'Solution costs at most 2x the optimal cost'
+    },
+    'ARA* (h2)': {
+        'name': 'ARA* (h2)',
+        'description': 'Anytime repairing A* with h2: weights 5, 3, 2, 1.5, 1, reusing each search',
+        'function': ARA_star,
+        'heuristic': heuristic_h2,
+        'optimal': True,
+        'note': 'Prints each improved solution and its bound; optimal once the w=1 search ends'
+    },
+    'IDA* (h2)': {
+        'name': 'IDA* (h2)',
+        'description': 'Iterative deepening A* with h2 and a fixed-size transposition table',
+        'function': IDA_star,
+        'heuristic': heuristic_h2,
+        'optimal': True,
+        'note': 'Optimal with flat memory; searches again every iteration, so far slower than A* (1-2 min on 2-d)'
+    },
+    'HDA* (h2)': {
+        'name': 'HDA* (h2)',
+        'description': 'Hash-distributed A* with h2: one worker process per core, each owning a share of the states',
+        'function': HDA_star,
+        'heuristic': heuristic_h2,
+        'optimal': True,
+        'note': 'Prints expansions per worker; needs several cores to beat A*'
+    },
+    'Retrograde': {
+        'name': 'Retrograde',
+        'description': 'Distance-to-goal table of the whole state cluster + greedy descent',
+        'function': retrograde_solve,
+        'heuristic': None,
+        'options': {'table_dir': './tables'},
+        'optimal': True,
+        'note': 'First run on a cluster builds ./tables/<layout>-<cluster>.json; later runs only look it up'
+    },
+    'BFS (slides)': {
+        'name': 'BFS (slides)',
+        'description': 'BFS where sliding any number of cells is one move',
+        'function': BFS,
+        'heuristic': None,
+        'options': {'slides': True},
+        'optimal': False,
+        'note': 'Cost counts slides, not single-cell moves'
+    },
+    'A* (h2, slides)': {
+        'name': 'A* (h2, slides)',
+        'description': 'A* with h2 where sliding any number of cells is one move',
+        'function': A_star,
+        'heuristic': heuristic_h2,
+        'options': {'slides': True},
+        'optimal': False,
+        'note': 'Cost counts slides, not single-cell moves'
     }
 }
 
+# Optional NumPy solver (only listed when NumPy is installed)
+if NUMPY_AVAILABLE:
+    ALGORITHMS['BFS (NumPy)'] = {
+        'name': 'BFS (NumPy)',
+        'description': 'Level-synchronous BFS expanding whole layers with NumPy array operations',
+        'function': vectorized_BFS,
+        'heuristic': None,
+        'optimal': True,
+        'note': 'Expands complete layers, so it may count more nodes than BFS'
+    }
+
+
+def uses_slides(algo_name):
+    """Check if an algorithm counts multi-cell slides as single moves."""
+    return ALGORITHMS[algo_name].get('options', {}).get('slides', False)
+
 
 # HELPER FUNCTIONS
+def accepts(function, parameter):
+    """Check if a solver function takes a given keyword argument."""
+    return parameter in inspect.signature(function).parameters
+
+
+def solver_signature(algo_config):
+    """
+    Describe what an algorithm entry computes (function, heuristic and
+    options) for the solution cache, independently of its display name.
+    """
+    heuristic = algo_config['heuristic']
+    return "|".join([
+        algo_config['function'].__name__,
+        heuristic.__name__ if heuristic else "-",
+        json.dumps(algo_config.get('options', {}), sort_keys=True)
+    ])
+
+
 def print_header(text, width=60):
     """Print a formatted header."""
     print("\n" + "="*width)
@@ -96,7 +257,7 @@ def load_puzzle(csv_file):
         return None
 
 
-def run_algorithm(algo_config, initial_state):
+def run_algorithm(algo_config, initial_state, cache=None, profile=None):
     """
     Run a single algorithm and return results.
     
@@ -105,6 +266,11 @@ def run_algorithm(algo_config, initial_state):
     Parameters:
         algo_config: Dictionary with algorithm configuration
         initial_state: Puzzle state to solve
+        cache: SolutionCache to read/write, or None to always search
+        profile: None, 'phases' (time per search phase, kept in the
+            result's 'profile') or 'full' (phases + cProfile and
+            tracemalloc, report written to PROFILE_DIR); profiling
+            always searches, even if the solution is cached
     
     Returns:
         Dictionary with results or None if failed
@@ -113,6 +279,7 @@ def run_algorithm(algo_config, initial_state):
     description = algo_config['description']
     function = algo_config['function']
     heuristic = algo_config['heuristic']
+    options = algo_config.get('options', {})
     note = algo_config.get('note', '')
     
     # Print algorithm info
@@ -122,15 +289,48 @@ def run_algorithm(algo_config, initial_state):
         print(f"Note: {note}")
     print()  # Blank line for readability
     
+    # A cache hit skips the search entirely
+    if cache is not None and not profile:
+        cached = cache.get(initial_state, solver_signature(algo_config))
+        if cached:
+            actions = cached['actions']
+            print(f"✓ Solution loaded from cache!")
+            print(f"  • Nodes expanded: {cached['steps']:,} (original search)")
+            print(f"  • Solution cost: {len(actions)} moves")
+            print(f"  • Time: {cached['time']:.4f} seconds (original search)")
+            
+            return {
+                'actions': actions,
+                'steps': cached['steps'],
+                'time': cached['time'],
+                'cost': len(actions),
+                'cached': True
+            }
+    
+    # Progress lines for the searches that support telemetry
+    if accepts(function, 'telemetry'):
+        options = dict(options, telemetry=PrintTelemetry(TELEMETRY_INTERVAL))
+    
+    # Phase timings for the searches that support them (cProfile and
+    # tracemalloc work with any algorithm)
+    profiler = None
+    session = contextlib.nullcontext()
+    if profile:
+        profiler = PhaseProfiler(use_cprofile=profile == 'full', use_tracemalloc=profile == 'full')
+        session = profiler.session()
+        if accepts(function, 'profiler'):
+            options = dict(options, profiler=profiler)
+    
     # Run the algorithm
     start_time = time.time()
     
     try:
         # Call with or without heuristic
-        if heuristic:
-            solution, steps = function(initial_state, heuristic)
-        else:
-            solution, steps = function(initial_state)
+        with session:
+            if heuristic:
+                solution, steps = function(initial_state, heuristic, **options)
+            else:
+                solution, steps = function(initial_state, **options)
         
         elapsed_time = time.time() - start_time
         
@@ -141,12 +341,25 @@ def run_algorithm(algo_config, initial_state):
             print(f"  • Solution cost: {solution.g} moves")
             print(f"  • Time: {elapsed_time:.4f} seconds")
             
-            return {
-                'solution': solution,
+            # Only the actions are kept: the visualizer replays the states
+            actions = solution.getSolution()
+            if cache is not None:
+                cache.put(initial_state, solver_signature(algo_config),
+                          actions, steps, elapsed_time)
+            
+            result = {
+                'actions': actions,
                 'steps': steps,
                 'time': elapsed_time,
-                'cost': solution.g
+                'cost': len(actions)
             }
+            if profiler:
+                result['profile'] = profiler
+                if profile == 'full':
+                    path = os.path.join(PROFILE_DIR, re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') + ".txt")
+                    profiler.write(path)
+                    print(f"  • Profile report: {path}")
+            return result
         else:
             print(f"✗ No solution found after {steps:,} nodes")
             return None
@@ -160,35 +373,52 @@ def run_algorithm(algo_config, initial_state):
         return None
 
 
-def run_all_algorithms(initial_state, algorithm_choice):
+def select_algorithms(algorithm_choice):
+    """
+    Returns: Names of the ALGORITHMS entries for 'all', 'bfs' or 'astar'
+    """
+    if algorithm_choice == 'all':
+        return list(ALGORITHMS.keys())
+    elif algorithm_choice == 'bfs':
+        return [k for k in ALGORITHMS.keys() if k.startswith('BFS')]
+    elif algorithm_choice == 'astar':
+        return [k for k in ALGORITHMS.keys() if k.startswith('A*')]
+    return []
+
+
+def run_all_algorithms(initial_state, algorithm_choice, cache=None, portfolio=None, profile=None):
     """
     Run selected algorithms on the puzzle.
     
     Parameters:
         initial_state: Puzzle to solve
         algorithm_choice: 'all', 'bfs', or 'astar'
+        cache: SolutionCache shared by all algorithms, or None
+        portfolio: None to run the algorithms one after another, or a
+            policy to run them concurrently (see run_portfolio):
+            'first' or 'all'
+        profile: Profiling mode passed to run_algorithm (not available
+            with a portfolio)
     
     Returns:
         Dictionary of results {algo_name: result_dict}
     """
     print_header("RUNNING ALGORITHMS")
     
-    results = {}
-    
     # Determine which algorithms to run
-    algorithms_to_run = []
+    algorithms_to_run = select_algorithms(algorithm_choice)
     
-    if algorithm_choice == 'all':
-        algorithms_to_run = list(ALGORITHMS.keys())
-    elif algorithm_choice == 'bfs':
-        algorithms_to_run = ['BFS']
-    elif algorithm_choice == 'astar':
-        algorithms_to_run = [k for k in ALGORITHMS.keys() if k.startswith('A*')]
+    if portfolio:
+        if profile:
+            print("⚠️  Profiling is not available with --portfolio")
+        return run_portfolio(initial_state, algorithms_to_run, portfolio, cache)
+    
+    results = {}
     
     # Run each algorithm
     for algo_name in algorithms_to_run:
         try:
-            result = run_algorithm(ALGORITHMS[algo_name], initial_state)
+            result = run_algorithm(ALGORITHMS[algo_name], initial_state, cache, profile)
             if result:
                 results[algo_name] = result
         
@@ -199,6 +429,137 @@ def run_all_algorithms(initial_state, algorithm_choice):
     return results
 
 
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(1)
+
+
+def portfolio_worker(algo_name, initial_state, result_queue):
+    """
+    Run one algorithm in a worker process and send back
+    (algo_name, actions or None, steps, time, error). Only the actions
+    cross the process boundary.
+    
+    When terminated (SIGTERM), the worker unwinds instead of dying on the
+    spot, so an algorithm that started its own processes (HDA*) stops them.
+    """
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    
+    algo_config = ALGORITHMS[algo_name]
+    function = algo_config['function']
+    heuristic = algo_config['heuristic']
+    options = algo_config.get('options', {})
+    
+    start_time = time.time()
+    try:
+        # Progress output of concurrent searches would interleave
+        with contextlib.redirect_stdout(io.StringIO()):
+            if heuristic:
+                solution, steps = function(initial_state, heuristic, **options)
+            else:
+                solution, steps = function(initial_state, **options)
+        actions = solution.getSolution() if solution else None
+        result_queue.put((algo_name, actions, steps, time.time() - start_time, None))
+    except Exception as e:
+        result_queue.put((algo_name, None, 0, time.time() - start_time, str(e)))
+
+
+def run_portfolio(initial_state, algorithms_to_run, policy='all', cache=None):
+    """
+    Run algorithms concurrently, one worker process each.
+    
+    Policies:
+        'first': stop at the first answer from an 'optimal' algorithm and
+            terminate the others (their results are dropped)
+        'all': wait for every algorithm; wall time is the slowest one
+            instead of the sum
+    
+    Returns:
+        Dictionary of results {algo_name: result_dict}, like run_all_algorithms
+    """
+    print_subheader(f"PORTFOLIO ({policy}): {', '.join(algorithms_to_run)}")
+    
+    results = {}
+    workers = {}
+    pending = set()  # Workers started that have not reported yet
+    result_queue = multiprocessing.Queue()
+    start_time = time.time()
+    
+    def record(algo_name, actions, steps, elapsed_time, cached=False):
+        """Store a result; returns True if the 'first' policy is satisfied."""
+        result = {
+            'actions': actions,
+            'steps': steps,
+            'time': elapsed_time,
+            'cost': len(actions)
+        }
+        if cached:
+            result['cached'] = True
+        results[algo_name] = result
+        source = "cache" if cached else f"{elapsed_time:.4f}s"
+        print(f"✓ {algo_name}: {len(actions)} moves, {steps:,} nodes ({source})")
+        return policy == 'first' and ALGORITHMS[algo_name].get('optimal', False)
+    
+    try:
+        # Cached solutions need no worker
+        for algo_name in algorithms_to_run:
+            algo_config = ALGORITHMS[algo_name]
+            cached = cache.get(initial_state, solver_signature(algo_config)) if cache is not None else None
+            if cached:
+                if record(algo_name, cached['actions'], cached['steps'], cached['time'], cached=True):
+                    return results
+        
+        for algo_name in algorithms_to_run:
+            if algo_name in results:
+                continue
+            # Not a daemon, so an algorithm may start its own workers (HDA*)
+            worker = multiprocessing.Process(
+                target=portfolio_worker,
+                args=(algo_name, initial_state, result_queue)
+            )
+            worker.start()
+            workers[algo_name] = worker
+        
+        pending.update(workers)
+        while pending:
+            try:
+                algo_name, actions, steps, elapsed_time, error = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                # A worker that died without reporting (e.g. out of memory)
+                for algo_name in [name for name in pending if not workers[name].is_alive()]:
+                    print(f"✗ {algo_name}: worker exited with code {workers[algo_name].exitcode}")
+                    pending.discard(algo_name)
+                continue
+            
+            pending.discard(algo_name)
+            if error:
+                print(f"✗ {algo_name}: algorithm failed: {error}")
+                continue
+            if actions is None:
+                print(f"✗ {algo_name}: no solution found after {steps:,} nodes")
+                continue
+            
+            if cache is not None:
+                cache.put(initial_state, solver_signature(ALGORITHMS[algo_name]),
+                          actions, steps, elapsed_time)
+            if record(algo_name, actions, steps, elapsed_time):
+                break
+    
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Stopping after {len(results)} algorithm(s) completed")
+    
+    finally:
+        stopped = [name for name in workers if name in pending]
+        for worker in workers.values():
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        if stopped:
+            print(f"Cancelled: {', '.join(stopped)}")
+    
+    print(f"\nPortfolio wall time: {time.time() - start_time:.4f} seconds")
+    return results
+
+
 def print_comparison_table(results):
     """
     Print a comparison table of all algorithm results.
@@ -218,8 +579,27 @@ def print_comparison_table(results):
     # Table rows
     for algo_name, data in results.items():
         efficiency = f"{data['steps']/data['cost']:.1f}" if data['cost'] > 0 else "N/A"
-        print(f"{algo_name:<15} {data['steps']:<12,} {data['cost']:<10} "
+        marker = "*" if data.get('cached') else ""
+        print(f"{algo_name + marker:<15} {data['steps']:<12,} {data['cost']:<10} "
               f"{data['time']:<12.4f} {efficiency:<12}")
+    
+    if any(data.get('cached') for data in results.values()):
+        print("\n* loaded from the solution cache (nodes and time of the original search)")
+
+
+def print_profiles(results):
+    """
+    Print the per-phase time breakdown of the profiled algorithms.
+    """
+    profiled = {name: data['profile'] for name, data in results.items() if 'profile' in data}
+    if not profiled:
+        return
+    
+    print_header("PROFILE")
+    
+    for algo_name, profiler in profiled.items():
+        print_subheader(algo_name)
+        print(profiler.report())
 
 
 def print_analysis(results):
@@ -243,11 +623,15 @@ def print_analysis(results):
     print(f"\n⚡ Fastest Execution:")
     print(f"   {fastest[0]} - {fastest[1]['time']:.4f} seconds")
     
-    # Optimal solution
-    min_cost = min(data['cost'] for data in results.values())
-    optimal_algos = [name for name, data in results.items() if data['cost'] == min_cost]
-    print(f"\n🎯 Optimal Solution Cost: {min_cost} moves")
-    print(f"   Found by: {', '.join(optimal_algos)}")
+    # Optimal solution (slide counts and cell moves are compared separately)
+    for slides, unit in ((False, 'moves'), (True, 'slides')):
+        costs = {name: data['cost'] for name, data in results.items() if uses_slides(name) == slides}
+        if not costs:
+            continue
+        min_cost = min(costs.values())
+        optimal_algos = [name for name, cost in costs.items() if cost == min_cost]
+        print(f"\n🎯 Optimal Solution Cost: {min_cost} {unit}")
+        print(f"   Found by: {', '.join(optimal_algos)}")
     
     # Heuristic comparison (if multiple A* algorithms ran)
     astar_results = {k: v for k, v in results.items() if k.startswith('A*')}
@@ -318,9 +702,11 @@ def visualize_solution_safe(initial_state, algo_name, result_data):
     print(f"\n🚀 Launching visualization...")
     
     try:
+        # Imported here so headless runs (e.g. batch.py) do not need pygame
+        from game_interface import visualize_solution
         visualize_solution(
             initial_state,
-            result_data['solution'],
+            result_data['actions'],
             algo_name,
             result_data['steps']
         )
@@ -378,9 +764,9 @@ def get_algorithm_choice():
     print_header("ALGORITHM SELECTION")
     
     print("\n📊 Available options:")
-    print("  1. Run all algorithms (BFS + A* with h1, h2, h3)")
+    print(f"  1. Run all algorithms ({', '.join(ALGORITHMS)})")
     print("  2. Run only BFS")
-    print("  3. Run only A* algorithms (h1, h2, h3)")
+    print("  3. Run only A* algorithms")
     
     choice = input("\nEnter choice (1-3, default: 1): ").strip()
     
@@ -392,6 +778,46 @@ def get_algorithm_choice():
         return 'all'
 
 
+def get_portfolio_policy(argv):
+    """
+    Read the portfolio policy from the command line: --portfolio (same as
+    --portfolio=all) or --portfolio=first.
+    
+    Returns:
+        String: 'first', 'all', or None to run algorithms one at a time
+    """
+    for arg in argv[1:]:
+        if arg == '--portfolio':
+            return 'all'
+        if arg.startswith('--portfolio='):
+            policy = arg.split('=', 1)[1]
+            if policy not in ('first', 'all'):
+                print(f"⚠️  Unknown portfolio policy '{policy}', using 'all'")
+                return 'all'
+            return policy
+    return None
+
+
+def get_profile_mode(argv):
+    """
+    Read the profiling mode from the command line: --profile (time per
+    search phase) or --profile=full (also cProfile and tracemalloc).
+    
+    Returns:
+        String: 'phases', 'full', or None to not profile
+    """
+    for arg in argv[1:]:
+        if arg == '--profile':
+            return 'phases'
+        if arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+            if mode not in ('phases', 'full'):
+                print(f"⚠️  Unknown profile mode '{mode}', using 'phases'")
+                return 'phases'
+            return mode
+    return None
+
+
 def get_visualization_preference():
     """
     Ask if user wants visualization.
@@ -406,7 +832,8 @@ def get_visualization_preference():
 
 
 # MAIN SOLVER FUNCTION
-def solve_puzzle(csv_file, algorithm_choice, use_visualization):
+def solve_puzzle(csv_file, algorithm_choice, use_visualization, use_cache=True, portfolio=None,
+                 profile=None):
     """
     Main solver function - orchestrates the entire solving process.
     
@@ -425,8 +852,13 @@ def solve_puzzle(csv_file, algorithm_choice, use_visualization):
     if not initial_state:
         return  # Error already printed in load_puzzle()
     
-    # Step 2: Run algorithms
-    results = run_all_algorithms(initial_state, algorithm_choice)
+    # Step 2: Run algorithms (cached solutions skip the search)
+    cache = SolutionCache(CACHE_PATH, CACHE_MAX_ENTRIES) if use_cache else None
+    try:
+        results = run_all_algorithms(initial_state, algorithm_choice, cache, portfolio, profile)
+    finally:
+        if cache is not None:
+            cache.close()
     
     if not results:
         print("\n⚠️  No algorithms completed successfully")
@@ -434,6 +866,7 @@ def solve_puzzle(csv_file, algorithm_choice, use_visualization):
     
     # Step 3: Show comparison and analysis
     print_comparison_table(results)
+    print_profiles(results)
     print_analysis(results)
     
     # Step 4: Visualization (if requested)
@@ -461,9 +894,12 @@ def main():
         csv_file = get_csv_file()
         algorithm_choice = get_algorithm_choice()
         use_visualization = get_visualization_preference()
+        use_cache = '--no-cache' not in sys.argv
+        portfolio = get_portfolio_policy(sys.argv)
+        profile = get_profile_mode(sys.argv)
         
         # Solve the puzzle
-        solve_puzzle(csv_file, algorithm_choice, use_visualization)
+        solve_puzzle(csv_file, algorithm_choice, use_visualization, use_cache, portfolio, profile)
         
         # Success message
         print_header("EXECUTION COMPLETED")
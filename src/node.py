@@ -1,21 +1,32 @@
+from array import array
+
+
 class Node:
     """
     This class represents a node in the search tree.
     Each node contains a state, parent reference, action, and costs.
     """
     
-    def __init__(self, state, parent=None, action=None):
+    # No per-node __dict__: searches create a lot of these
+    __slots__ = ('state', 'parent', 'action', 'key', 'g', 'f')
+    
+    def __init__(self, state, parent=None, action=None, key=None):
         """
         Initialize a node in the search tree.
         
         Parameters:
-        - state: RushHourPuzzle instance representing the state
+        - state: RushHourPuzzle instance, or a compact state (tuple of
+          positions) when the search runs on a PuzzleSpec
         - parent: Reference to parent node
-        - action: Action that led to this state (vehicle_id, direction)
+        - action: Action that led to this state (vehicle_id, direction),
+          or (vehicle_id, direction, distance) for a multi-cell slide
+        - key: Packed state key (PuzzleSpec.pack), computed once by the
+          search and cached here for its closed/open lookups
         """
         self.state = state      # The puzzle state
         self.parent = parent    # Parent node
         self.action = action    # Action that created this node
+        self.key = key          # Packed state key (compact searches)
         self.g = 0              # Path cost from initial state
         self.f = 0              # Fitness function for A* (f = g + h)
         
@@ -48,7 +59,7 @@ class Node:
         """
         Returns the sequence of actions from initial state to current state.
         
-        Returns: List of actions (vehicle_id, direction) tuples
+        Returns: List of actions (vehicle_id, direction[, distance]) tuples
         """
         actions = []
         current_node = self
@@ -62,7 +73,7 @@ class Node:
         actions.reverse()
         return actions
     
-    def setF(self, heuristic_function):
+    def setF(self, heuristic_function, spec=None):
         """
         Calculate the fitness function f for A* algorithm.
         f = g + h
@@ -70,8 +81,12 @@ class Node:
         
         Parameters:
         - heuristic_function: Function that takes a state and returns h value
+        - spec: PuzzleSpec to pass along when the state is compact
         """
-        h = heuristic_function(self.state)
+        if spec is None:
+            h = heuristic_function(self.state)
+        else:
+            h = heuristic_function(self.state, spec)
         self.f = self.g + h
     
     def __lt__(self, other):
@@ -93,4 +108,80 @@ class Node:
         """
         Hash function based on state.
         """
-        return hash(self.state)
\ No newline at end of file
+        return hash(self.state)
+
+
+class NodeArena:
+    """
+    Compact search-tree storage: node i is a row of three parallel arrays
+    (parent index, action code, g) instead of a Node object, and holds no
+    state. Actions are interned, so the per-node action is a small int
+    code. Paths are rebuilt from the actions only when asked.
+    """
+    
+    ROOT = -1  # Parent index of the root
+    
+    def __init__(self):
+        self.parents = array('i')
+        self.action_codes = array('H')
+        self.g_values = array('i')
+        self.codes = {}    # action -> code
+        self.actions = []  # code -> action
+    
+    def __len__(self):
+        return len(self.parents)
+    
+    def code(self, action):
+        """Returns the code of an action, interning it on first use."""
+        code = self.codes.get(action)
+        if code is None:
+            code = self.codes[action] = len(self.actions)
+            self.actions.append(action)
+        return code
+    
+    def add(self, parent=ROOT, action=None):
+        """
+        Add a node and return its index.
+        
+        Parameters:
+        - parent: Index of the parent node, or NodeArena.ROOT
+        - action: Action that led from the parent to this node
+        """
+        self.parents.append(parent)
+        if parent == self.ROOT:
+            self.action_codes.append(0)
+            self.g_values.append(0)
+        else:
+            self.action_codes.append(self.code(action))
+            self.g_values.append(self.g_values[parent] + 1)
+        return len(self.parents) - 1
+    
+    def update(self, index, parent, action):
+        """Re-parent a node (a better path to it was found)."""
+        self.parents[index] = parent
+        self.action_codes[index] = self.code(action)
+        self.g_values[index] = self.g_values[parent] + 1
+    
+    def g(self, index):
+        """Returns the path cost of a node."""
+        return self.g_values[index]
+    
+    def getSolution(self, index):
+        """
+        Returns the sequence of actions from the root to node index.
+        
+        Returns: List of actions (vehicle_id, direction[, distance]) tuples
+        """
+        actions = []
+        while self.parents[index] != self.ROOT:
+            actions.append(self.actions[self.action_codes[index]])
+            index = self.parents[index]
+        actions.reverse()
+        return actions
+    
+    def getNode(self, index, spec, start):
+        """
+        Returns the Node chain of node index with full RushHourPuzzle
+        states, replaying its actions from the compact start state.
+        """
+        return spec.materialize(spec.replay(start, self.getSolution(index)))
@@ -0,0 +1,78 @@
+import argparse
+import contextlib
+import glob
+import io
+import time
+import tracemalloc
+
+from rush_hour_puzzle import RushHourPuzzle
+from search_algorithms import A_star, heuristic_h1, heuristic_h2, heuristic_h3
+from open_lists import OPEN_LISTS, make_open_list
+
+
+HEURISTICS = {
+    'h1': heuristic_h1,
+    'h2': heuristic_h2,
+    'h3': heuristic_h3
+}
+
+
+def measure(puzzle, heuristic_function, open_list_name):
+    """
+    Run A* with one open list implementation.
+
+    The timed run and the memory run are separate, since tracemalloc
+    slows the search down.
+
+    Returns: Dictionary with cost, expansions, peak open list entries,
+    expansions per second and peak traced memory (bytes)
+    """
+    open_list = make_open_list(open_list_name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start_time = time.perf_counter()
+        solution, steps = A_star(puzzle, heuristic_function, open_list=open_list)
+        elapsed_time = time.perf_counter() - start_time
+
+        tracemalloc.start()
+        A_star(puzzle, heuristic_function, open_list=open_list_name)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'cost': solution.g if solution else None,
+        'steps': steps,
+        'peak_entries': open_list.peak,
+        'rate': steps / elapsed_time if elapsed_time > 0 else 0,
+        'peak_memory': peak_memory
+    }
+
+
+def main():
+    # Example:
+    #   python src/open_list_benchmark.py 'examples/*.csv' --heuristic h3
+    parser = argparse.ArgumentParser(
+        description="Compare A* open list implementations (heap size, speed, memory).")
+    parser.add_argument('puzzles', nargs='*', default=['examples/*.csv'],
+                        help="CSV files or globs (default: examples/*.csv)")
+    parser.add_argument('--heuristic', choices=list(HEURISTICS), default='h2')
+    args = parser.parse_args()
+
+    csv_files = sorted({path for pattern in args.puzzles for path in glob.glob(pattern)})
+    heuristic_function = HEURISTICS[args.heuristic]
+
+    print(f"\n{'Puzzle':<16} {'Open list':<10} {'Moves':<7} {'Nodes':<10} "
+          f"{'Peak entries':<14} {'Nodes/s':<10} {'Peak mem (KB)':<14}")
+    print("-" * 85)
+    for csv_file in csv_files:
+        puzzle = RushHourPuzzle(csv_file=csv_file)
+        name = csv_file.replace('\\', '/').split('/')[-1]
+        for open_list_name in OPEN_LISTS:
+            result = measure(puzzle, heuristic_function, open_list_name)
+            cost = result['cost'] if result['cost'] is not None else "-"
+            print(f"{name:<16} {open_list_name:<10} {cost:<7} {result['steps']:<10,} "
+                  f"{result['peak_entries']:<14,} {result['rate']:<10,.0f} "
+                  f"{result['peak_memory'] / 1024:<14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
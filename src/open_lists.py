@@ -0,0 +1,212 @@
+import heapq
+
+
+class HeapOpenList:
+    """
+    Binary heap (heapq) with lazy updates: a better path to a queued
+    state pushes a second entry, and the stale one is skipped when it is
+    popped. Ties on f are broken first-in first-out.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}  # key -> item of its live entry
+        self.counter = 0
+        self.peak = 0      # Largest number of physical entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Returns the item queued under key."""
+        return self.entries[key]
+
+    def size(self):
+        """Returns the number of physical entries, stale ones included."""
+        return len(self.heap)
+
+    def push(self, key, f, g, item):
+        """Queue item under key with priority f (or lower its priority)."""
+        heapq.heappush(self.heap, (f, self.counter, key))
+        self.counter += 1
+        self.entries[key] = item
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def pop(self):
+        """Remove and return (key, item) with the lowest f."""
+        while True:
+            _, _, key = heapq.heappop(self.heap)
+            item = self.entries.pop(key, None)
+            if item is not None:
+                return key, item
+
+
+class BucketOpenList:
+    """
+    Bucket queue for small integer f values: one bucket per f, split by g.
+    Ties on f go to the largest g (the node closest to a goal), then last
+    in first out. A better path pushes a new entry; stale ones are
+    skipped when popped.
+    """
+
+    def __init__(self):
+        self.buckets = []  # f -> list (indexed by g) of stacks of (key, g)
+        self.entries = {}  # key -> (g, item) of its live entry
+        self.min_f = 0
+        self.count = 0
+        self.peak = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        return self.entries[key][1]
+
+    def size(self):
+        return self.count
+
+    def push(self, key, f, g, item):
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+        bucket = self.buckets[f]
+        while len(bucket) <= g:
+            bucket.append([])
+        bucket[g].append((key, g))
+        self.entries[key] = (g, item)
+
+        if f < self.min_f or self.count == 0:
+            self.min_f = f
+        self.count += 1
+        if self.count > self.peak:
+            self.peak = self.count
+
+    def pop(self):
+        while True:
+            bucket = self.buckets[self.min_f]
+            while bucket and not bucket[-1]:
+                bucket.pop()
+            if not bucket:
+                self.min_f += 1
+                continue
+
+            key, g = bucket[-1].pop()
+            self.count -= 1
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == g:
+                del self.entries[key]
+                return key, entry[1]
+
+
+class IndexedHeapOpenList:
+    """
+    Binary heap with a key -> position index, so a better path lowers the
+    priority of the queued entry in place (decrease-key) and the heap
+    never holds stale entries. Ties on f are broken first-in first-out.
+    """
+
+    def __init__(self):
+        self.heap = []       # [priority, key] pairs, priority = (f, counter)
+        self.positions = {}  # key -> index in heap
+        self.items = {}      # key -> item
+        self.counter = 0
+        self.peak = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def get(self, key):
+        return self.items[key]
+
+    def size(self):
+        return len(self.heap)
+
+    def push(self, key, f, g, item):
+        priority = (f, self.counter)
+        self.counter += 1
+        self.items[key] = item
+
+        index = self.positions.get(key)
+        if index is None:
+            self.heap.append([priority, key])
+            index = len(self.heap) - 1
+            self.positions[key] = index
+            if len(self.heap) > self.peak:
+                self.peak = len(self.heap)
+        elif priority < self.heap[index][0]:
+            self.heap[index][0] = priority
+        else:
+            return
+        self._sift_up(index)
+
+    def pop(self):
+        heap = self.heap
+        _, key = heap[0]
+        last = heap.pop()
+        del self.positions[key]
+        if heap:
+            heap[0] = last
+            self.positions[last[1]] = 0
+            self._sift_down(0)
+        return key, self.items.pop(key)
+
+    def _sift_up(self, index):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[index] = heap[parent]
+            self.positions[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+    def _sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[index] = heap[child]
+            self.positions[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+
+# Open list implementations selectable with the `open_list` argument of A_star
+OPEN_LISTS = {
+    'heap': HeapOpenList,
+    'bucket': BucketOpenList,
+    'indexed': IndexedHeapOpenList
+}
+
+
+def make_open_list(open_list='heap'):
+    """
+    Returns an open list: a new one for a name ('heap', 'bucket' or
+    'indexed'), or open_list itself if it is already an instance (e.g.
+    to read its statistics after the search).
+    """
+    if not isinstance(open_list, str):
+        return open_list
+    if open_list not in OPEN_LISTS:
+        raise ValueError(f"Unknown open list '{open_list}' (choose from: {', '.join(OPEN_LISTS)})")
+    return OPEN_LISTS[open_list]()
@@ -0,0 +1,319 @@
+import heapq
+import multiprocessing
+import os
+import queue
+
+from puzzle_spec import make_spec
+from search_algorithms import heuristic_h1
+from budget import SOLVED, EXCEEDED, UNSOLVABLE
+
+
+# Nodes a worker expands between two looks at its inbox
+EXPANSION_BATCH = 64
+
+# Counters each worker publishes for telemetry after every batch:
+# expanded, generated, duplicates, open, closed
+STATS = 5
+
+
+def owner(key, workers):
+    """
+    Returns the index of the worker that owns a packed state key. Uses a
+    Fibonacci hash so every vehicle's bit field affects the owner.
+    """
+    return (hash(key) * 0x9E3779B97F4A7C15 >> 32) % workers
+
+
+def _hda_worker(index, workers, initial_state, heuristic_function, engine, slides,
+                inboxes, results, work, incumbent, done, stats):
+    """
+    One HDA* worker: an A* over the states it owns.
+
+    Messages are batches of (key, state, g, parent_key, action). Children
+    owned by this worker are inserted directly; the others are batched
+    per owner and sent once per EXPANSION_BATCH expansions.
+
+    Termination: `work` counts busy workers plus batches in flight. A
+    sender counts a batch before putting it, and an idle receiver counts
+    itself busy again before releasing the batches it took, so `work`
+    only reaches 0 when every worker is idle and no batch is in flight.
+    A worker is idle when it has no open node with f below the incumbent
+    (the best goal cost found by any worker, shared in `incumbent`).
+
+    The worker's counters go to its STATS slots of the shared `stats`
+    array after every batch.
+    """
+    spec = make_spec(initial_state, engine, slides)
+    inbox = inboxes[index]
+    # An orphaned worker is adopted by another process. (The sentinel of
+    # multiprocessing.parent_process() is unreliable here: the workers
+    # forked after this one inherit the other end of its pipe.)
+    parent_pid = os.getppid()
+
+    def caller_gone():
+        return os.getppid() != parent_pid
+
+    open_list = []
+    g_values = {}
+    parents = {}  # key -> (parent key, action)
+    counter = 0
+    expansions = 0
+    generated = 0
+    duplicates = 0
+    best_goal = None  # (g, key) of the best goal this worker expanded
+    idle = True
+
+    def add_work(delta):
+        with work.get_lock():
+            work.value += delta
+            return work.value
+
+    def insert(key, state, g, parent_key, action):
+        nonlocal counter, duplicates
+        # Reopen only on a strictly better g
+        if key in g_values and g_values[key] <= g:
+            duplicates += 1
+            return
+        f = g + heuristic_function(state, spec)
+        if f >= incumbent.value:
+            return
+        g_values[key] = g
+        parents[key] = (parent_key, action)
+        heapq.heappush(open_list, (f, counter, g, key, state))
+        counter += 1
+
+    while True:
+        # Stop when the caller went away (e.g. killed)
+        if caller_gone():
+            break
+
+        batches = []
+        if idle:
+            try:
+                batches.append(inbox.get(timeout=0.05))
+            except queue.Empty:
+                # Stop when the search is over
+                if done.is_set():
+                    break
+                continue
+        while True:
+            try:
+                batches.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        if batches:
+            if idle:
+                add_work(1)
+                idle = False
+            for batch in batches:
+                for message in batch:
+                    insert(*message)
+            add_work(-len(batches))
+
+        outgoing = {}
+        for _ in range(EXPANSION_BATCH):
+            if not open_list:
+                break
+            f, _, g, key, state = heapq.heappop(open_list)
+
+            # Stale entry (a better g was found after it was pushed)
+            if g != g_values[key]:
+                continue
+
+            # Every remaining node is at least as bad as the incumbent
+            if f >= incumbent.value:
+                open_list.clear()
+                break
+
+            if spec.is_goal(state):
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                        best_goal = (g, key)
+                continue
+
+            expansions += 1
+            successors = spec.successors(state)
+            generated += len(successors)
+            for action, successor_state in successors:
+                child_key = spec.next_key(key, action)
+                destination = owner(child_key, workers)
+                if destination == index:
+                    insert(child_key, successor_state, g + 1, key, action)
+                else:
+                    outgoing.setdefault(destination, []).append(
+                        (child_key, successor_state, g + 1, key, action))
+
+        for destination, batch in outgoing.items():
+            add_work(1)
+            inboxes[destination].put(batch)
+
+        if open_list and open_list[0][0] >= incumbent.value:
+            open_list.clear()
+
+        stats[index * STATS:(index + 1) * STATS] = [expansions, generated, duplicates,
+                                                    len(open_list), len(g_values)]
+
+        if not open_list and not idle:
+            idle = True
+            if add_work(-1) == 0:
+                done.set()
+
+    if caller_gone():
+        # Nobody reads the queues any more: exit without reporting, and
+        # without waiting for the feeder threads to flush into them
+        for outbox in inboxes:
+            outbox.cancel_join_thread()
+        results.cancel_join_thread()
+        return
+
+    results.put((index, expansions, best_goal, parents))
+
+
+def HDA_star(initial_state, heuristic_function=heuristic_h1, workers=None,
+             engine='grid', slides=False, telemetry=None, budget=None):
+    """
+    Hash-distributed A* (HDA*): states are assigned to worker processes by
+    a hash of their packed key. Each worker keeps its own open list and
+    g table and sends generated children to their owners through queues.
+
+    A goal only becomes the answer once every worker has run out of open
+    nodes with f below its cost, so with an admissible heuristic the
+    solution is optimal.
+
+    Parameters:
+    - initial_state: RushHourPuzzle instance
+    - heuristic_function: Function to estimate cost to goal
+    - workers: Number of worker processes (default: one per core)
+    - engine: Move generator, 'grid' or 'bitboard'
+    - slides: Count any multi-cell slide as a single action
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py),
+      summed over the workers and taken while waiting for them (so at
+      least `interval` expansions apart); f is the best goal cost found
+      so far (None before), g is None
+    - budget: Budget (see budget.py); only its deadline applies, since the
+      states live in the worker processes. When it runs out the workers
+      are terminated and there is no partial result
+
+    Returns:
+    - goal_node: Node containing the goal state, or None
+    - steps: Number of nodes expanded (all workers)
+    """
+    workers = workers or os.cpu_count() or 1
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
+
+    if budget is not None:
+        budget.start()
+
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("HDA*")
+        report_at = telemetry.interval
+
+    if spec.is_goal(start):
+        print("HDA*: Initial state is goal!")
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return spec.materialize(spec.replay(start, [])), 0
+
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    work = multiprocessing.Value('q', 1)  # the initial batch is in flight
+    incumbent = multiprocessing.Value('q', 2 ** 62)
+    done = multiprocessing.Event()
+    stats = multiprocessing.Array('q', workers * STATS, lock=False)
+
+    def snapshot():
+        totals = [sum(stats[k::STATS]) for k in range(STATS)]
+        best = incumbent.value if incumbent.value < 2 ** 62 else None
+        return (*totals, best, None)
+
+    processes = [
+        multiprocessing.Process(
+            target=_hda_worker,
+            args=(index, workers, initial_state, heuristic_function, engine, slides,
+                  inboxes, results, work, incumbent, done, stats),
+            daemon=True
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    inboxes[owner(start_key, workers)].put([(start_key, start, 0, None, None)])
+
+    # Collect the workers' tables before joining (large results would
+    # otherwise block the workers' queue feeder threads)
+    reports = []
+    reason = None
+    try:
+        while len(reports) < workers:
+            try:
+                reports.append(results.get(timeout=0.1))
+            except queue.Empty:
+                expanded = sum(stats[0::STATS])
+                if report_at != -1 and expanded >= report_at:
+                    telemetry.update(*snapshot())
+                    report_at = expanded + telemetry.interval
+                if budget is not None:
+                    reason = budget.exceeded()
+                    if reason:
+                        break
+    finally:
+        # Workers that have not reported are stopped (budget exceeded, or
+        # the caller is unwinding, e.g. a portfolio run terminated)
+        done.set()
+        for process in processes:
+            if len(reports) < workers:
+                process.terminate()
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if reason:
+        print(f"HDA*: Budget exceeded ({reason})")
+        if telemetry is not None:
+            telemetry.finish(EXCEEDED, *snapshot())
+        budget.finish(EXCEEDED, reason)
+        return None, sum(report[1] for report in reports)
+
+    reports.sort()
+    expansions = [report[1] for report in reports]
+    steps = sum(expansions)
+    print(f"HDA*: Expansions per worker: {', '.join(f'{n:,}' for n in expansions)}")
+
+    goals = [report[2] for report in reports if report[2] is not None]
+    if not goals:
+        print("HDA*: No solution found!")
+        if telemetry is not None:
+            telemetry.finish('unsolved', *snapshot())
+        if budget is not None:
+            budget.finish(UNSOLVABLE)
+        return None, steps
+
+    _, goal_key = min(goals)
+    parents = {}
+    for report in reports:
+        parents.update(report[3])
+
+    # Parent pointers always lead to a node with a smaller g, so this
+    # walk ends at the start
+    actions = []
+    key = goal_key
+    while key != start_key:
+        key, action = parents[key]
+        actions.append(action)
+    actions.reverse()
+
+    print(f"HDA*: Solution found in {steps} steps with {workers} worker(s)!")
+    if telemetry is not None:
+        telemetry.finish('solved', *snapshot())
+    if budget is not None:
+        budget.finish(SOLVED)
+    return spec.materialize(spec.replay(start, actions)), steps
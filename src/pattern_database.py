@@ -0,0 +1,327 @@
+import itertools
+import json
+import os
+import sys
+from array import array
+from collections import deque
+
+from puzzle_spec import compact
+from rush_hour_puzzle import RushHourPuzzle
+
+
+# Where heuristic_pdb loads and saves databases (None: build in memory only)
+PDB_DIR = "./pdbs"
+
+# Costs are 16-bit (array typecode 'H'); this one marks abstract states
+# that cannot reach the goal
+UNREACHABLE = 0xFFFF
+
+
+class PatternDatabase:
+    """
+    Additive pattern databases for one puzzle layout.
+
+    Each pattern is X plus a disjoint group of other vehicles; the others
+    are removed from the board (only walls stay). In the abstract puzzle,
+    the exact cost to the goal of every placement of the pattern's
+    vehicles is computed once by a backward BFS and stored in an
+    array('H') indexed by the vehicles' positions.
+
+    The costs are partitioned so the patterns add up: a move of a group
+    vehicle costs 1 in its own pattern and a move of X costs 1 in the
+    first pattern only (0 in the others). Every real move is then counted
+    in at most one pattern, and a real solution projected on a pattern is
+    still a solution there (fewer vehicles in the way), so the sum of the
+    lookups is admissible.
+    """
+
+    def __init__(self, spec, patterns, tables):
+        """
+        Parameters:
+        - spec: PuzzleSpec of the layout
+        - patterns: Lists of vehicle indices, X first in each
+        - tables: One array('H') of costs per pattern
+        """
+        self.spec = spec
+        self.patterns = patterns
+        self.tables = tables
+
+        # Mixed-radix index: table[sum(state[v] * radix[v])]
+        self.radices = []
+        for pattern in patterns:
+            radix = 1
+            radices = []
+            for i in reversed(pattern):
+                radices.append(radix)
+                radix *= spec.limits[i] - spec.lengths[i] + 1
+            radices.reverse()
+            self.radices.append(radices)
+
+    @staticmethod
+    def select_patterns(spec, state=None, group_size=9):
+        """
+        Group the other vehicles around X along the blocker chains of a
+        state: first the vehicles in X's way to the exit, then the ones in
+        the way of each blocker leaving the cells it must free, and so on
+        (breadth first). Vehicles that must move out of each other's way
+        end up in the same pattern, where their interactions are counted.
+        The vehicles no chain reaches come last, and the order is cut into
+        groups of group_size.
+
+        Without a state, the vertical vehicles (they can block X's row)
+        nearest the exit come first.
+
+        Parameters:
+        - spec: PuzzleSpec of the layout
+        - state: Compact state the chains are followed from (usually the
+          initial state)
+        - group_size: Vehicles per pattern besides X (a pattern of 10
+          vehicles has a table of up to ~10 million entries, 20 MB, built
+          in a few seconds)
+
+        Returns: List of patterns (vehicle index lists, X first)
+        """
+        xi = spec.x_index
+        others = [i for i in range(len(spec.ids)) if i != xi]
+
+        if state is None or spec.goal_position is None:
+            def relevance(i):
+                # Vertical vehicles that can block X's row, nearest the exit first
+                if spec.orientations[i] == 'V' and spec.orientations[xi] == 'H':
+                    return (0, -spec.lanes[i])
+                return (1, i)
+
+            others.sort(key=relevance)
+        else:
+            wall_mask = 0
+            for wall_x, wall_y in spec.walls:
+                wall_mask |= 1 << (wall_y * spec.board_width + wall_x)
+            owners = {}
+            for i, pos in enumerate(state):
+                for k in range(pos, pos + spec.lengths[i]):
+                    owners[spec.bases[i] + k * spec.strides[i]] = i
+
+            def swept(i, target):
+                # Cells vehicle i crosses from its position to target
+                low, high = sorted((state[i], target))
+                mask = 0
+                for pos in range(low, high + 1):
+                    mask |= spec.cell_mask(i, pos)
+                return mask & ~spec.cell_mask(i, state[i])
+
+            def occupants(mask):
+                return [owners[cell] for cell in sorted(owners) if mask >> cell & 1]
+
+            def follow(i, targets):
+                # Queue the vehicles in i's way to the targets, with the
+                # cells they must free
+                for target in targets:
+                    path = swept(i, target)
+                    for j in occupants(path):
+                        if j not in seen:
+                            seen.add(j)
+                            queue.append((j, path))
+
+            # X is followed again when it is in a blocker's way (it has to
+            # back off), but only the other vehicles are grouped
+            order = []
+            queue = deque()
+            seen = set()
+            follow(xi, [spec.goal_position])
+            while queue:
+                i, required = queue.popleft()
+                if i != xi:
+                    order.append(i)
+                follow(i, [target for target in range(spec.limits[i] - spec.lengths[i] + 1)
+                           if not spec.cell_mask(i, target) & (required | wall_mask)])
+            others = order + [i for i in others if i not in seen]
+
+        groups = [others[k:k + group_size] for k in range(0, len(others), group_size)]
+        return [[xi] + group for group in groups] or [[xi]]
+
+    @classmethod
+    def build(cls, spec, state=None, group_size=9):
+        """
+        Build every pattern's table with a 0-1 BFS backwards from the
+        abstract goal states (moves are reversible, so the backward moves
+        are the forward ones). The patterns come from select_patterns().
+        """
+        patterns = cls.select_patterns(spec, state, group_size)
+        database = cls(spec, patterns, [])
+
+        for n, pattern in enumerate(patterns):
+            radices = database.radices[n]
+            ranges = [range(spec.limits[i] - spec.lengths[i] + 1) for i in pattern]
+            size = radices[0] * len(ranges[0])
+            table = array('H', [UNREACHABLE]) * size
+
+            wall_mask = 0
+            for wall_x, wall_y in spec.walls:
+                wall_mask |= 1 << (wall_y * spec.board_width + wall_x)
+            masks = [[spec.cell_mask(i, pos) for pos in ranges[k]]
+                     for k, i in enumerate(pattern)]
+
+            def occupancy(positions):
+                occupied = wall_mask
+                for k, pos in enumerate(positions):
+                    mask = masks[k][pos]
+                    if occupied & mask:
+                        return None
+                    occupied |= mask
+                return occupied
+
+            # Move costs: X counts only in the first pattern
+            costs = [0 if (k == 0 and n > 0) else 1 for k in range(len(pattern))]
+
+            queue = deque()
+            goal_ranges = [[spec.goal_position]] + ranges[1:]
+            for positions in itertools.product(*goal_ranges):
+                if occupancy(positions) is not None:
+                    index = sum(pos * radix for pos, radix in zip(positions, radices))
+                    table[index] = 0
+                    queue.append((positions, 0))
+
+            while queue:
+                positions, distance = queue.popleft()
+                index = sum(pos * radix for pos, radix in zip(positions, radices))
+                if table[index] < distance:
+                    continue
+                occupied = occupancy(positions)
+
+                for k, i in enumerate(pattern):
+                    pos = positions[k]
+                    own = masks[k][pos]
+                    free = occupied & ~own
+                    for step in (-1, 1):
+                        new_pos = pos + step
+                        while 0 <= new_pos < len(ranges[k]) and not free & masks[k][new_pos]:
+                            new_distance = distance + costs[k]
+                            new_index = index + (new_pos - pos) * radices[k]
+                            if new_distance < table[new_index]:
+                                table[new_index] = new_distance
+                                successor = positions[:k] + (new_pos,) + positions[k + 1:]
+                                if costs[k]:
+                                    queue.append((successor, new_distance))
+                                else:
+                                    queue.appendleft((successor, new_distance))
+                            if not spec.slides:
+                                break
+                            new_pos += step
+
+            database.tables.append(table)
+
+        return database
+
+    @classmethod
+    def load(cls, path, spec):
+        """
+        Load databases saved with save(): a JSON header line followed by
+        the tables' 16-bit costs.
+
+        Raises ValueError if the file was built for another layout or in
+        another format (the one-byte tables of older versions).
+        """
+        with open(path, 'rb') as file:
+            header = json.loads(file.readline())
+            if header['fingerprint'] != spec.fingerprint():
+                raise ValueError(f"Pattern database '{path}' was built for a different puzzle layout")
+            if header.get('typecode') != 'H':
+                raise ValueError(f"Pattern database '{path}' has an outdated format")
+            tables = []
+            for size in header['sizes']:
+                table = array('H')
+                table.fromfile(file, size)
+                if header['byteorder'] != sys.byteorder:
+                    table.byteswap()
+                tables.append(table)
+        return cls(spec, header['patterns'], tables)
+
+    def save(self, path):
+        """Save the databases, tagged with the layout fingerprint."""
+        header = {
+            'fingerprint': self.spec.fingerprint(),
+            'patterns': self.patterns,
+            'typecode': 'H',
+            'byteorder': sys.byteorder,
+            'sizes': [len(table) for table in self.tables]
+        }
+        with open(path, 'wb') as file:
+            file.write(json.dumps(header).encode() + b"\n")
+            for table in self.tables:
+                table.tofile(file)
+
+    def lookup(self, state):
+        """
+        Returns the sum of the patterns' costs for a compact state, or
+        None if some pattern cannot reach the goal from it.
+        """
+        total = 0
+        for pattern, radices, table in zip(self.patterns, self.radices, self.tables):
+            cost = table[sum(state[i] * radix for i, radix in zip(pattern, radices))]
+            if cost == UNREACHABLE:
+                return None
+            total += cost
+        return total
+
+
+# Databases already built or loaded in this process, by layout fingerprint
+_databases = {}
+
+
+def get_database(spec, state=None):
+    """
+    Returns the PatternDatabase of a layout: from memory, from
+    PDB_DIR/<fingerprint>.pdb, or built (and saved there) on first use
+    or when the saved file is outdated, with the patterns following the
+    blocker chains of state.
+    """
+    fingerprint = spec.fingerprint()
+    database = _databases.get(fingerprint)
+    if database is not None:
+        return database
+
+    path = os.path.join(PDB_DIR, f"{fingerprint}.pdb") if PDB_DIR else None
+    if path and os.path.exists(path):
+        try:
+            database = PatternDatabase.load(path, spec)
+        except ValueError as e:
+            print(f"PDB: {e}, rebuilding it")
+    if database is None:
+        database = PatternDatabase.build(spec, state)
+        if path:
+            os.makedirs(PDB_DIR, exist_ok=True)
+            database.save(path)
+            print(f"PDB: Saved {len(database.patterns)} pattern(s) to {path}")
+
+    _databases[fingerprint] = database
+    return database
+
+
+def heuristic_pdb(state, spec=None):
+    """
+    Heuristic PDB (admissible): sum of the additive pattern database
+    costs of the state's layout (built once per layout, then cached).
+    """
+    if spec is None:
+        spec, state = compact(state)
+
+    if spec.goal_position is None:
+        return 0
+
+    cost = get_database(spec, state).lookup(state)
+    if cost is None:
+        # Some pattern cannot reach the goal: neither can the puzzle
+        return spec.board_width * spec.board_height * len(spec.ids)
+    return cost
+
+
+if __name__ == "__main__":
+    # Build and save the pattern databases of a puzzle's layout:
+    #   python src/pattern_database.py examples/example1.csv
+    if len(sys.argv) != 2:
+        print("Usage: python pattern_database.py <puzzle.csv>")
+        sys.exit(1)
+
+    puzzle = RushHourPuzzle(csv_file=sys.argv[1])
+    spec, state = compact(puzzle)
+    print(f"h_pdb of the initial state: {heuristic_pdb(state, spec)}")
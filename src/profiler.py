@@ -0,0 +1,124 @@
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+
+class PhaseProfiler:
+    """
+    Attributes search time to its phases: successor generation, state
+    keys (packing / next_key), heuristic evaluations and open list
+    operations.
+
+    A search given a profiler wraps the functions it calls for each phase
+    with wrap(); the wrappers add up calls and time per phase. Timing
+    every call adds overhead of its own (two clock reads per call), so
+    compare the phases with each other rather than with an unprofiled run.
+
+    With use_cprofile and/or use_tracemalloc, session() additionally runs
+    the search under cProfile (hottest functions) and tracemalloc (peak
+    memory and top allocation sites).
+    """
+
+    def __init__(self, use_cprofile=False, use_tracemalloc=False):
+        self.use_cprofile = use_cprofile
+        self.use_tracemalloc = use_tracemalloc
+        self.times = {}   # phase -> cumulative seconds
+        self.calls = {}   # phase -> number of calls
+        self.total_time = None
+        self.stats = None
+        self.peak_memory = None
+        self.snapshot = None
+
+    def wrap(self, phase, function):
+        """Returns function, timed and counted under `phase`."""
+        self.times.setdefault(phase, 0.0)
+        self.calls.setdefault(phase, 0)
+        times = self.times
+        calls = self.calls
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            result = function(*args)
+            times[phase] += clock() - start
+            calls[phase] += 1
+            return result
+
+        return timed
+
+    @contextlib.contextmanager
+    def session(self):
+        """Time the enclosed search (and run cProfile/tracemalloc if enabled)."""
+        profile = cProfile.Profile() if self.use_cprofile else None
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        if profile:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_time = time.perf_counter() - start
+            if profile:
+                profile.disable()
+                self.stats = pstats.Stats(profile)
+            if self.use_tracemalloc:
+                _, self.peak_memory = tracemalloc.get_traced_memory()
+                self.snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+    def report(self, top=10):
+        """
+        Returns the breakdown as text: one line per phase (calls, time,
+        time per call, share of the run), then the cProfile and
+        tracemalloc sections if they were enabled.
+        """
+        if not self.times:
+            lines = ["No phase timings (this algorithm does not support the profiler)"]
+            if self.total_time is not None:
+                lines.append(f"Total time: {self.total_time:.4f} s")
+            return "\n".join(lines + self.extra_sections(top))
+
+        lines = [f"{'Phase':<12} {'Calls':<12} {'Time (s)':<10} {'Per call (µs)':<15} {'Share':<6}"]
+        total = self.total_time or sum(self.times.values())
+        for phase, seconds in sorted(self.times.items(), key=lambda item: -item[1]):
+            calls = self.calls[phase]
+            per_call = seconds / calls * 1e6 if calls else 0
+            share = seconds / total if total else 0
+            lines.append(f"{phase:<12} {calls:<12,} {seconds:<10.4f} {per_call:<15.2f} {share:<6.1%}")
+        if self.total_time is not None:
+            other = self.total_time - sum(self.times.values())
+            lines.append(f"{'other':<12} {'':<12} {other:<10.4f} {'':<15} "
+                         f"{other / total if total else 0:<6.1%}")
+            lines.append(f"{'total':<12} {'':<12} {self.total_time:<10.4f}")
+
+        return "\n".join(lines + self.extra_sections(top))
+
+    def extra_sections(self, top):
+        """Returns the report lines of cProfile and tracemalloc, if enabled."""
+        lines = []
+        if self.stats is not None:
+            output = io.StringIO()
+            self.stats.stream = output
+            self.stats.sort_stats('cumulative').print_stats(top)
+            lines.append("\ncProfile (cumulative):")
+            lines.append(output.getvalue().strip())
+
+        if self.peak_memory is not None:
+            lines.append(f"\nPeak traced memory: {self.peak_memory / 1024:,.0f} KB")
+            for statistic in self.snapshot.statistics('lineno')[:top]:
+                lines.append(f"  {statistic}")
+
+        return lines
+
+    def write(self, path, top=30):
+        """Write report(top) to a text file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(self.report(top) + "\n")
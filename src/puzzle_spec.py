@@ -0,0 +1,660 @@
+import hashlib
+
+from node import Node
+from rush_hour_puzzle import RushHourPuzzle
+
+# Direction that undoes each move direction
+OPPOSITE = {'L': 'R', 'R': 'L', 'U': 'D', 'D': 'U'}
+
+
+class PuzzleSpec:
+    """
+    Immutable description of everything that never changes during a search:
+    the board size, the walls and, for every vehicle, its id, orientation,
+    length and lane (the row of a horizontal vehicle, the column of a
+    vertical one).
+
+    With the spec shared by the whole search, a state is just a tuple holding
+    one int per vehicle (x for horizontal vehicles, y for vertical ones) in
+    the spec's vehicle order, so a successor costs one small tuple.
+
+    The spec also fixes the move model: one-cell moves (vehicle_id,
+    direction), or with slides=True multi-cell slides (vehicle_id,
+    direction, distance) where any slide costs a single move.
+    """
+
+    __slots__ = ('board_height', 'board_width', 'walls', 'ids', 'orientations',
+                 'lengths', 'lanes', 'index', 'x_index', 'goal_position',
+                 'bases', 'strides', 'limits', 'directions', 'empty_grid',
+                 'slides', 'shifts', 'key_steps')
+
+    def __init__(self, puzzle, slides=False):
+        """
+        Build the spec from a RushHourPuzzle.
+
+        Parameters:
+        - puzzle: RushHourPuzzle instance (only its layout is used)
+        - slides: Generate multi-cell slides instead of one-cell moves
+        """
+        self.slides = slides
+        self.board_height = puzzle.board_height
+        self.board_width = puzzle.board_width
+        self.walls = tuple(puzzle.walls)
+        self.ids = tuple(v['id'] for v in puzzle.vehicles)
+        self.orientations = tuple(v['orientation'] for v in puzzle.vehicles)
+        self.lengths = tuple(v['length'] for v in puzzle.vehicles)
+        self.lanes = tuple(v['y'] if v['orientation'] == 'H' else v['x']
+                           for v in puzzle.vehicles)
+        self.index = {vid: i for i, vid in enumerate(self.ids)}
+        self.x_index = self.index.get('X')
+
+        # Cell (x, y) lives at y * board_width + x in the flat grid, and cell
+        # k of vehicle i at position p is bases[i] + (p + k) * strides[i]
+        self.bases = tuple(lane * self.board_width if o == 'H' else lane
+                           for o, lane in zip(self.orientations, self.lanes))
+        self.strides = tuple(1 if o == 'H' else self.board_width
+                             for o in self.orientations)
+        self.limits = tuple(self.board_width if o == 'H' else self.board_height
+                            for o in self.orientations)
+        self.directions = tuple(('L', 'R') if o == 'H' else ('U', 'D')
+                                for o in self.orientations)
+
+        # Same exit as RushHourPuzzle.isGoal: X's leftmost cell at
+        # board_width - 2 on row board_height // 2 - 1
+        self.goal_position = None
+        if self.x_index is not None:
+            exit_row = self.board_height // 2 - 1
+            if self.orientations[self.x_index] == 'H' and self.lanes[self.x_index] == exit_row:
+                self.goal_position = self.board_width - 2
+
+        # Packed keys: vehicle i's position lives in its own bit field
+        # starting at shifts[i]; wide enough for any position on the board
+        bits = max(self.board_width, self.board_height).bit_length()
+        self.shifts = tuple(bits * i for i in range(len(self.ids)))
+        self.key_steps = {}
+        for i, vid in enumerate(self.ids):
+            back, forward = self.directions[i]
+            self.key_steps[(vid, back)] = -(1 << self.shifts[i])
+            self.key_steps[(vid, forward)] = 1 << self.shifts[i]
+
+        empty_grid = ['.'] * (self.board_height * self.board_width)
+        for wall_x, wall_y in self.walls:
+            empty_grid[wall_y * self.board_width + wall_x] = '#'
+        self.empty_grid = tuple(empty_grid)
+
+    def encode(self, puzzle):
+        """
+        Returns the compact state (tuple of positions) of a RushHourPuzzle
+        that has the same layout as this spec.
+        """
+        return tuple(v['x'] if v['orientation'] == 'H' else v['y']
+                     for v in puzzle.vehicles)
+
+    def fingerprint(self):
+        """
+        Returns a short hex digest identifying the layout (board size,
+        walls, vehicles with their lanes) and move model. Every puzzle in
+        the same state cluster has the same fingerprint, so it can key
+        tables and caches stored on disk.
+        """
+        description = repr((self.board_height, self.board_width, sorted(self.walls),
+                            self.ids, self.orientations, self.lengths, self.lanes,
+                            self.slides))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def pack(self, state):
+        """
+        Returns the packed key of a compact state: one int holding every
+        position in a fixed bit field, so two states share a key only if
+        they are equal.
+        """
+        key = 0
+        for pos, shift in zip(state, self.shifts):
+            key |= pos << shift
+        return key
+
+    def unpack(self, key):
+        """Returns the compact state of a packed key (inverse of pack)."""
+        field_mask = (1 << max(self.board_width, self.board_height).bit_length()) - 1
+        return tuple((key >> shift) & field_mask for shift in self.shifts)
+
+    def next_key(self, key, action):
+        """
+        Returns the packed key of the state reached from `key` by `action`,
+        without repacking the whole state.
+        """
+        if len(action) > 2:
+            return key + self.key_steps[action[:2]] * action[2]
+        return key + self.key_steps[action]
+
+    def apply(self, state, action):
+        """
+        Returns the compact state reached from `state` by `action` (the
+        action is assumed legal).
+        """
+        i = self.index[action[0]]
+        distance = action[2] if len(action) > 2 else 1
+        if action[1] in ('L', 'U'):
+            distance = -distance
+        return state[:i] + (state[i] + distance,) + state[i + 1:]
+
+    @staticmethod
+    def inverse(action):
+        """Returns the action that undoes `action`."""
+        return (action[0], OPPOSITE[action[1]]) + tuple(action[2:])
+
+    def goal_states(self, like=None):
+        """
+        Generate every goal state of this layout: X at the exit and every
+        non-overlapping arrangement of the other vehicles around it.
+        Nothing is generated if X can never reach the exit.
+
+        Vehicles sharing a lane can never pass each other; with `like` (a
+        compact state, e.g. the initial one), only arrangements keeping
+        them in the same order as in `like` are generated, since the
+        others cannot be reached from it.
+        """
+        if self.goal_position is None:
+            return
+
+        xi = self.x_index
+        occupied = 0
+        for wall_x, wall_y in self.walls:
+            occupied |= 1 << (wall_y * self.board_width + wall_x)
+        x_mask = self.cell_mask(xi, self.goal_position)
+        if occupied & x_mask:
+            return
+
+        others = [i for i in range(len(self.ids)) if i != xi]
+        positions = [0] * len(self.ids)
+        positions[xi] = self.goal_position
+
+        # For each vehicle, the ones placed before it in its lane and whether
+        # they must stay below it
+        ordered = [[] for _ in self.ids]
+        if like is not None:
+            placed = [xi]
+            for i in others:
+                for j in placed:
+                    if self.orientations[j] == self.orientations[i] and self.lanes[j] == self.lanes[i]:
+                        ordered[i].append((j, like[j] < like[i]))
+                placed.append(i)
+
+        def place(n, occupied):
+            if n == len(others):
+                yield tuple(positions)
+                return
+            i = others[n]
+            for pos in range(self.limits[i] - self.lengths[i] + 1):
+                mask = self.cell_mask(i, pos)
+                if not occupied & mask and all((positions[j] < pos) == below
+                                               for j, below in ordered[i]):
+                    positions[i] = pos
+                    yield from place(n + 1, occupied | mask)
+
+        yield from place(0, occupied | x_mask)
+
+    def cell_mask(self, i, pos):
+        """Returns the bitmask of the cells vehicle i covers at pos."""
+        mask = 0
+        for k in range(pos, pos + self.lengths[i]):
+            mask |= 1 << (self.bases[i] + k * self.strides[i])
+        return mask
+
+    def replay(self, state, actions):
+        """
+        Returns the compact-state Node chain obtained by applying `actions`
+        one after the other from `state`.
+        """
+        node = Node(state, None, None, self.pack(state))
+        for action in actions:
+            state = self.apply(state, action)
+            node = Node(state, node, action, self.next_key(node.key, action))
+        return node
+
+    def decode(self, state):
+        """
+        Returns a full RushHourPuzzle for a compact state.
+        """
+        vehicles = []
+        for i, pos in enumerate(state):
+            horizontal = self.orientations[i] == 'H'
+            vehicles.append({
+                'id': self.ids[i],
+                'x': pos if horizontal else self.lanes[i],
+                'y': self.lanes[i] if horizontal else pos,
+                'orientation': self.orientations[i],
+                'length': self.lengths[i]
+            })
+        return RushHourPuzzle(vehicles=vehicles,
+                              board_height=self.board_height,
+                              board_width=self.board_width,
+                              walls=list(self.walls),
+                              vehicle_index=self.index)
+
+    def grid(self, state):
+        """
+        Returns the flat occupancy grid of a state: '.', '#' or a vehicle id
+        per cell, row by row.
+        """
+        grid = list(self.empty_grid)
+        for i, pos in enumerate(state):
+            base = self.bases[i]
+            stride = self.strides[i]
+            vid = self.ids[i]
+            for k in range(pos, pos + self.lengths[i]):
+                grid[base + k * stride] = vid
+        return grid
+
+    def is_goal(self, state):
+        """Checks if the red car 'X' is at the exit position."""
+        return self.goal_position is not None and state[self.x_index] == self.goal_position
+
+    def successors(self, state):
+        """
+        Generate all one-cell moves from a compact state.
+
+        Returns: List of (action, successor_state), in the same order as
+        RushHourPuzzle.successorFunction
+        """
+        if self.slides:
+            return self.slide_successors(state)
+
+        grid = self.grid(state)
+        successors = []
+
+        for i, pos in enumerate(state):
+            base = self.bases[i]
+            stride = self.strides[i]
+            back, forward = self.directions[i]
+
+            # Try moving LEFT / UP
+            if pos > 0 and grid[base + (pos - 1) * stride] == '.':
+                successors.append(((self.ids[i], back),
+                                   state[:i] + (pos - 1,) + state[i + 1:]))
+
+            # Try moving RIGHT / DOWN
+            end = pos + self.lengths[i]
+            if end < self.limits[i] and grid[base + end * stride] == '.':
+                successors.append(((self.ids[i], forward),
+                                   state[:i] + (pos + 1,) + state[i + 1:]))
+
+        return successors
+
+    def slide_successors(self, state):
+        """
+        Generate every multi-cell slide from a compact state: each vehicle
+        can slide any number of free cells back or forward in one action.
+
+        Returns: List of ((vehicle_id, direction, distance), successor_state)
+        """
+        occupancy = self.occupancy(state)
+        successors = []
+
+        for i, pos in enumerate(state):
+            back, forward = self.directions[i]
+            free_back, free_forward = self.free_run(occupancy, i, pos)
+            vid = self.ids[i]
+            head = state[:i]
+            tail = state[i + 1:]
+
+            for distance in range(1, free_back + 1):
+                successors.append(((vid, back, distance), head + (pos - distance,) + tail))
+            for distance in range(1, free_forward + 1):
+                successors.append(((vid, forward, distance), head + (pos + distance,) + tail))
+
+        return successors
+
+    def occupancy(self, state):
+        """
+        Returns the occupancy structure used by mobility() (the flat grid).
+        """
+        return self.grid(state)
+
+    def free_run(self, occupancy, i, pos):
+        """
+        Returns how many free cells vehicle i at pos has directly behind
+        it and directly ahead of it.
+        """
+        base = self.bases[i]
+        stride = self.strides[i]
+
+        free_back = 0
+        k = pos - 1
+        while k >= 0 and occupancy[base + k * stride] == '.':
+            free_back += 1
+            k -= 1
+
+        free_forward = 0
+        k = pos + self.lengths[i]
+        while k < self.limits[i] and occupancy[base + k * stride] == '.':
+            free_forward += 1
+            k += 1
+
+        return free_back, free_forward
+
+    def mobility(self, occupancy, i, pos):
+        """
+        Returns (can_move_back, can_move_forward) for vehicle i at pos:
+        left/right for horizontal vehicles, up/down for vertical ones.
+        """
+        base = self.bases[i]
+        stride = self.strides[i]
+        end = pos + self.lengths[i]
+        can_move_back = pos > 0 and occupancy[base + (pos - 1) * stride] == '.'
+        can_move_forward = end < self.limits[i] and occupancy[base + end * stride] == '.'
+        return can_move_back, can_move_forward
+
+    def blockers(self, state, end):
+        """
+        Returns the indices of the vehicles occupying X's row between the
+        cell right after X and column end (exclusive).
+        """
+        xi = self.x_index
+        if self.orientations[xi] == 'H':
+            row = self.lanes[xi]
+            start = state[xi] + self.lengths[xi]
+        else:
+            row = state[xi]
+            start = self.lanes[xi] + self.lengths[xi]
+
+        blocking = []
+        for i, pos in enumerate(state):
+            if i == xi:
+                continue
+            if self.orientations[i] == 'H':
+                if self.lanes[i] == row and pos < end and pos + self.lengths[i] > start:
+                    blocking.append(i)
+            elif start <= self.lanes[i] < end and pos <= row < pos + self.lengths[i]:
+                blocking.append(i)
+        return blocking
+
+    def materialize(self, node):
+        """
+        Rebuild a solution Node chain with full RushHourPuzzle states from a
+        Node chain holding compact states (used once, for the final path).
+        """
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+
+        result = None
+        for compact_node in chain:
+            result = Node(self.decode(compact_node.state), result, compact_node.action)
+        return result
+
+
+class MutableBoard:
+    """
+    A single mutable board for depth-first searches. Applying a move only
+    rewrites the cells the vehicle vacates and newly occupies, and moves are
+    undone in reverse order, so no board is allocated per child.
+    """
+
+    __slots__ = ('spec', 'positions', 'grid', 'history')
+
+    def __init__(self, spec, state):
+        """
+        Parameters:
+        - spec: PuzzleSpec describing the layout
+        - state: compact state to start from
+        """
+        self.spec = spec
+        self.positions = list(state)
+        self.grid = spec.grid(state)
+        self.history = []
+
+    def state(self):
+        """Returns the current compact state (a snapshot tuple)."""
+        return tuple(self.positions)
+
+    def is_goal(self):
+        """Checks if the red car 'X' is at the exit position."""
+        spec = self.spec
+        return spec.goal_position is not None and self.positions[spec.x_index] == spec.goal_position
+
+    def legal_moves(self):
+        """
+        Returns the actions that are legal on the current board, in the same
+        order as PuzzleSpec.successors.
+        """
+        spec = self.spec
+        grid = self.grid
+        moves = []
+
+        if spec.slides:
+            for i, pos in enumerate(self.positions):
+                back, forward = spec.directions[i]
+                # The board is always a grid, whatever engine the spec uses
+                free_back, free_forward = PuzzleSpec.free_run(spec, grid, i, pos)
+                for distance in range(1, free_back + 1):
+                    moves.append((spec.ids[i], back, distance))
+                for distance in range(1, free_forward + 1):
+                    moves.append((spec.ids[i], forward, distance))
+            return moves
+
+        for i, pos in enumerate(self.positions):
+            base = spec.bases[i]
+            stride = spec.strides[i]
+            back, forward = spec.directions[i]
+
+            if pos > 0 and grid[base + (pos - 1) * stride] == '.':
+                moves.append((spec.ids[i], back))
+
+            end = pos + spec.lengths[i]
+            if end < spec.limits[i] and grid[base + end * stride] == '.':
+                moves.append((spec.ids[i], forward))
+
+        return moves
+
+    def apply(self, action):
+        """
+        Apply a legal action (one-cell move or slide) in place and
+        remember it for undo().
+        """
+        i = self.spec.index[action[0]]
+        distance = action[2] if len(action) > 2 else 1
+        old = self.positions[i]
+        new = old - distance if action[1] in ('L', 'U') else old + distance
+
+        self.shift(i, old, new)
+        self.history.append((i, old))
+
+    def undo(self):
+        """
+        Undo the last applied action.
+        """
+        i, old = self.history.pop()
+        self.shift(i, self.positions[i], old)
+
+    def shift(self, i, old, new):
+        """
+        Move vehicle i from old to new, touching only the cells that change.
+        """
+        spec = self.spec
+        grid = self.grid
+        base = spec.bases[i]
+        stride = spec.strides[i]
+        length = spec.lengths[i]
+
+        # Vacated cells
+        for k in range(old, old + length):
+            if not new <= k < new + length:
+                grid[base + k * stride] = '.'
+
+        # Newly occupied cells
+        vid = spec.ids[i]
+        for k in range(new, new + length):
+            if not old <= k < old + length:
+                grid[base + k * stride] = vid
+
+        self.positions[i] = new
+
+
+def compact(puzzle):
+    """
+    Returns (spec, state) for a RushHourPuzzle.
+    """
+    spec = PuzzleSpec(puzzle)
+    return spec, spec.encode(puzzle)
+
+
+class BitboardSpec(PuzzleSpec):
+    """
+    PuzzleSpec variant where board occupancy is a single int (bit
+    y * board_width + x set for every occupied cell).
+
+    For each vehicle and each position it can take, the mask of the cells
+    it covers and the bit of the cell just behind/ahead of it are
+    precomputed, so move legality is a couple of mask tests. Successors are
+    generated in the same order as PuzzleSpec, so both engines return
+    identical solutions.
+    """
+
+    __slots__ = ('wall_mask', 'masks', 'back_bits', 'forward_bits')
+
+    def __init__(self, puzzle, slides=False):
+        super().__init__(puzzle, slides)
+
+        self.wall_mask = 0
+        for wall_x, wall_y in self.walls:
+            self.wall_mask |= 1 << (wall_y * self.board_width + wall_x)
+
+        masks = []
+        back_bits = []
+        forward_bits = []
+        for i in range(len(self.ids)):
+            base = self.bases[i]
+            stride = self.strides[i]
+            length = self.lengths[i]
+            limit = self.limits[i]
+
+            vehicle_masks = []
+            vehicle_back = []
+            vehicle_forward = []
+            for pos in range(limit - length + 1):
+                mask = 0
+                for k in range(pos, pos + length):
+                    mask |= 1 << (base + k * stride)
+                vehicle_masks.append(mask)
+                vehicle_back.append(1 << (base + (pos - 1) * stride) if pos > 0 else 0)
+                end = pos + length
+                vehicle_forward.append(1 << (base + end * stride) if end < limit else 0)
+
+            masks.append(tuple(vehicle_masks))
+            back_bits.append(tuple(vehicle_back))
+            forward_bits.append(tuple(vehicle_forward))
+
+        self.masks = tuple(masks)
+        self.back_bits = tuple(back_bits)
+        self.forward_bits = tuple(forward_bits)
+
+    def occupancy(self, state):
+        """
+        Returns the occupancy bitboard of a state (walls included).
+        """
+        occupied = self.wall_mask
+        masks = self.masks
+        for i, pos in enumerate(state):
+            occupied |= masks[i][pos]
+        return occupied
+
+    def successors(self, state):
+        """
+        Generate all one-cell moves from a compact state using mask tests.
+
+        Returns: List of (action, successor_state)
+        """
+        if self.slides:
+            return self.slide_successors(state)
+
+        occupied = self.occupancy(state)
+        successors = []
+
+        for i, pos in enumerate(state):
+            back, forward = self.directions[i]
+
+            # Try moving LEFT / UP
+            back_bit = self.back_bits[i][pos]
+            if back_bit and not occupied & back_bit:
+                successors.append(((self.ids[i], back),
+                                   state[:i] + (pos - 1,) + state[i + 1:]))
+
+            # Try moving RIGHT / DOWN
+            forward_bit = self.forward_bits[i][pos]
+            if forward_bit and not occupied & forward_bit:
+                successors.append(((self.ids[i], forward),
+                                   state[:i] + (pos + 1,) + state[i + 1:]))
+
+        return successors
+
+    def mobility(self, occupancy, i, pos):
+        """
+        Returns (can_move_back, can_move_forward) for vehicle i at pos.
+        """
+        back_bit = self.back_bits[i][pos]
+        forward_bit = self.forward_bits[i][pos]
+        return (bool(back_bit) and not occupancy & back_bit,
+                bool(forward_bit) and not occupancy & forward_bit)
+
+    def free_run(self, occupancy, i, pos):
+        """
+        Returns how many free cells vehicle i at pos has directly behind
+        it and directly ahead of it, following the precomputed edge bits.
+        """
+        back_bits = self.back_bits[i]
+        forward_bits = self.forward_bits[i]
+
+        free_back = 0
+        k = pos
+        while back_bits[k] and not occupancy & back_bits[k]:
+            free_back += 1
+            k -= 1
+
+        free_forward = 0
+        k = pos
+        while forward_bits[k] and not occupancy & forward_bits[k]:
+            free_forward += 1
+            k += 1
+
+        return free_back, free_forward
+
+    def blockers(self, state, end):
+        """
+        Returns the indices of the vehicles whose mask intersects X's row
+        between the cell right after X and column end (exclusive).
+        """
+        xi = self.x_index
+        if self.orientations[xi] == 'H':
+            row = self.lanes[xi]
+            start = state[xi] + self.lengths[xi]
+        else:
+            row = state[xi]
+            start = self.lanes[xi] + self.lengths[xi]
+
+        lane_mask = 0
+        for x in range(start, end):
+            lane_mask |= 1 << (row * self.board_width + x)
+
+        masks = self.masks
+        return [i for i, pos in enumerate(state)
+                if i != xi and masks[i][pos] & lane_mask]
+
+
+# Move generators selectable with the `engine` argument of the searches
+ENGINES = {
+    'grid': PuzzleSpec,
+    'bitboard': BitboardSpec
+}
+
+
+def make_spec(puzzle, engine='grid', slides=False):
+    """
+    Build the spec of a RushHourPuzzle for the given engine name
+    ('grid' or 'bitboard') and move model (one-cell moves or slides).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}' (choose from: {', '.join(ENGINES)})")
+    return ENGINES[engine](puzzle, slides)
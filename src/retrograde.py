@@ -0,0 +1,237 @@
+import glob
+import json
+import os
+import sys
+from collections import deque
+
+from puzzle_spec import make_spec
+from budget import SOLVED, EXCEEDED, UNSOLVABLE
+from rush_hour_puzzle import RushHourPuzzle
+
+
+class DistanceTable:
+    """
+    Exact distance to the goal for every state of a cluster: all the states
+    reachable from one puzzle (same vehicles, lanes and walls, any
+    positions). Built once by retrograde analysis, after which any puzzle
+    of the cluster is solved by a lookup and a greedy descent.
+    """
+
+    def __init__(self, spec, distances):
+        """
+        Parameters:
+        - spec: PuzzleSpec shared by every state of the cluster
+        - distances: Dictionary packed state key -> moves to the goal
+          (states that cannot reach the goal are absent)
+        """
+        self.spec = spec
+        self.distances = distances
+
+    @classmethod
+    def build(cls, puzzle, engine='grid', slides=False, budget=None):
+        """
+        Enumerate the whole cluster of a puzzle with a forward BFS, then run
+        a backward BFS from all of its goal states. Moves are reversible, so
+        the backward search reuses the successor function.
+
+        budget (already started by the caller) is checked every
+        budget.interval states; if it runs out, no table is returned.
+
+        Returns: (DistanceTable or None, number of states expanded)
+        """
+        spec = make_spec(puzzle, engine, slides)
+        start = spec.encode(puzzle)
+
+        # Forward: enumerate the cluster
+        cluster = {spec.pack(start): start}
+        queue = deque([start])
+        steps = 0
+
+        # State count of the next budget check (-1: never)
+        check_at = budget.interval if budget is not None else -1
+
+        def exceeded(entries):
+            nonlocal check_at
+            check_at += budget.interval
+            reason = budget.exceeded(entries)
+            if reason:
+                print(f"Retrograde: Budget exceeded ({reason}) after {steps} states")
+                budget.finish(EXCEEDED, reason)
+            return reason
+
+        while queue:
+            if steps == check_at and exceeded(len(cluster)):
+                return None, steps
+            state = queue.popleft()
+            steps += 1
+            for _, successor_state in spec.successors(state):
+                key = spec.pack(successor_state)
+                if key not in cluster:
+                    cluster[key] = successor_state
+                    queue.append(successor_state)
+
+        # Backward: distance from every goal state of the cluster
+        distances = {}
+        for key, state in cluster.items():
+            if spec.is_goal(state):
+                distances[key] = 0
+                queue.append((state, key))
+
+        while queue:
+            if steps == check_at and exceeded(len(cluster) + len(distances)):
+                return None, steps
+            state, key = queue.popleft()
+            steps += 1
+            distance = distances[key] + 1
+            for action, successor_state in spec.successors(state):
+                successor_key = spec.next_key(key, action)
+                if successor_key not in distances:
+                    distances[successor_key] = distance
+                    queue.append((successor_state, successor_key))
+
+        print(f"Retrograde: {len(cluster):,} states in cluster, "
+              f"{len(distances):,} can reach the goal")
+        return cls(spec, distances), steps
+
+    @classmethod
+    def load(cls, path, puzzle, engine='grid', slides=False):
+        """
+        Load a table saved with save() for the cluster of a puzzle.
+
+        Raises ValueError if the file was built for another layout.
+        """
+        spec = make_spec(puzzle, engine, slides)
+        with open(path, 'r') as file:
+            data = json.load(file)
+
+        if data['fingerprint'] != spec.fingerprint():
+            raise ValueError(f"Table '{path}' was built for a different puzzle layout")
+
+        distances = {key: distance for key, distance in data['distances']}
+        return cls(spec, distances)
+
+    @classmethod
+    def find(cls, table_dir, puzzle, engine='grid', slides=False):
+        """
+        Look for a saved table holding the puzzle's state. A layout can
+        have several clusters, so table_dir may hold several tables per
+        layout fingerprint (see file_name); each is loaded until one holds
+        the state.
+
+        Returns: (DistanceTable, path), or (None, None) if none does
+        """
+        spec = make_spec(puzzle, engine, slides)
+        key = spec.pack(spec.encode(puzzle))
+        for path in sorted(glob.glob(os.path.join(table_dir, f"{spec.fingerprint()}*.json"))):
+            table = cls.load(path, puzzle, engine, slides)
+            if key in table.distances:
+                return table, path
+        return None, None
+
+    def file_name(self):
+        """
+        Returns the file name of the table: the layout fingerprint and the
+        smallest packed key of the cluster, which tells clusters apart.
+        """
+        return f"{self.spec.fingerprint()}-{min(self.distances):x}.json"
+
+    def save(self, path):
+        """Save the table as JSON, tagged with the layout fingerprint."""
+        data = {
+            'fingerprint': self.spec.fingerprint(),
+            'distances': list(self.distances.items())
+        }
+        with open(path, 'w') as file:
+            json.dump(data, file)
+
+    def distance(self, puzzle):
+        """Returns the exact number of moves to solve a puzzle, or None."""
+        return self.distances.get(self.spec.pack(self.spec.encode(puzzle)))
+
+    def solve(self, puzzle):
+        """
+        Greedy descent: from the puzzle's state, always take a move to a
+        state one step closer to the goal.
+
+        Returns:
+        - goal_node: Node chain of an optimal solution, or None
+        - steps: Number of states visited on the way down
+        """
+        spec = self.spec
+        state = spec.encode(puzzle)
+        key = spec.pack(state)
+        distance = self.distances.get(key)
+        if distance is None:
+            return None, 0
+
+        actions = []
+        steps = 1
+        while distance > 0:
+            for action, successor_state in spec.successors(state):
+                successor_key = spec.next_key(key, action)
+                if self.distances.get(successor_key) == distance - 1:
+                    actions.append(action)
+                    state, key = successor_state, successor_key
+                    distance -= 1
+                    break
+            else:
+                raise ValueError("Distance table is inconsistent with the puzzle")
+            steps += 1
+
+        return spec.materialize(spec.replay(spec.encode(puzzle), actions)), steps
+
+
+def retrograde_solve(initial_state, table_dir=None, engine='grid', slides=False, budget=None):
+    """
+    Solve a puzzle from its cluster's distance table.
+
+    With table_dir, a table holding the puzzle's state is loaded from
+    table_dir (see DistanceTable.find), or built and saved there, so later
+    runs on any puzzle of the same cluster skip the retrograde analysis.
+    Tables of unsolvable clusters are empty and not saved. budget (see
+    budget.py) limits the table construction; there is no partial result.
+
+    Returns:
+    - goal_node: Node chain of an optimal solution, or None
+    - steps: States expanded to build the table (if built) plus descent steps
+    """
+    if budget is not None:
+        budget.start()
+
+    steps = 0
+    table = None
+    if table_dir:
+        table, path = DistanceTable.find(table_dir, initial_state, engine, slides)
+        if table is not None:
+            print(f"Retrograde: Loading table {path}")
+
+    if table is None:
+        # Built from the puzzle itself, so a miss below means unsolvable
+        table, steps = DistanceTable.build(initial_state, engine, slides, budget)
+        if table is None:
+            return None, steps
+        if table_dir and table.distances:
+            os.makedirs(table_dir, exist_ok=True)
+            path = os.path.join(table_dir, table.file_name())
+            table.save(path)
+            print(f"Retrograde: Table saved to {path}")
+
+    solution, descent_steps = table.solve(initial_state)
+    if solution is None:
+        print("Retrograde: No solution found!")
+    if budget is not None:
+        budget.finish(SOLVED if solution else UNSOLVABLE)
+    return solution, steps + descent_steps
+
+
+if __name__ == "__main__":
+    # Build and save the table of a puzzle's cluster:
+    #   python src/retrograde.py examples/example1.csv tables
+    if len(sys.argv) != 3:
+        print("Usage: python retrograde.py <puzzle.csv> <table_dir>")
+        sys.exit(1)
+
+    puzzle = RushHourPuzzle(csv_file=sys.argv[1])
+    solution, _ = retrograde_solve(puzzle, table_dir=sys.argv[2])
+    if solution:
+        print(f"Optimal solution: {solution.g} moves")
@@ -1,10 +1,13 @@
 import csv
-import copy
 
 class RushHourPuzzle:
+    # (dx, dy) of each move direction
+    DIRECTIONS = {'L': (-1, 0), 'R': (1, 0), 'U': (0, -1), 'D': (0, 1)}
+    
    # Initialize the puzzle state
     
-    def __init__(self, csv_file=None, vehicles=None, board_height=6, board_width=6):
+    def __init__(self, csv_file=None, vehicles=None, board_height=6, board_width=6, walls=None, board=None,
+                 vehicle_index=None, strict=False):
        
         self.board_height = board_height
         self.board_width = board_width
@@ -13,23 +16,39 @@ class RushHourPuzzle:
         self.board = []     
         
         if csv_file:
-            # open the CSV file in read mode (if provided)
-            self.setVehicles(csv_file)
+            # open the CSV file in read mode (if provided); strict raises on
+            # a missing or malformed file instead of printing the error
+            self.setVehicles(csv_file, strict)
         elif vehicles:
             # set the vehicles list
             self.vehicles = vehicles
         
-        # Create the board visualization
-        self.setBoard()
+        if walls:
+            # Walls never move, so successors share the same list
+            self.walls = walls
+        
+        # Vehicle id -> index in self.vehicles. Moves never reorder the
+        # vehicles, so successors share the same map
+        if vehicle_index is None:
+            vehicle_index = {vehicle['id']: i for i, vehicle in enumerate(self.vehicles)}
+        self.vehicle_index = vehicle_index
+        
+        # Create the board visualization (unless an up-to-date one is given)
+        if board is None:
+            self.setBoard()
+        else:
+            self.board = board
     
-    def setVehicles(self, csv_file):
+    def setVehicles(self, csv_file, strict=False):
         # Read and create vehicles and walls from a CSV file
         try:
             with open(csv_file, 'r') as file:
                 reader = csv.reader(file)
                 
                 # Read first line for board dimensions
-                first_line = next(reader)
+                first_line = next(reader, None)
+                if first_line is None:
+                    raise ValueError("missing the board size line")
                 self.board_height = int(first_line[0])
                 self.board_width = int(first_line[1])
                 
@@ -50,12 +69,56 @@ class RushHourPuzzle:
                             'length': int(row[4])
                         }
                         self.vehicles.append(vehicle)
+            
+            if strict:
+                self.validate()
         
         except FileNotFoundError:
+            if strict:
+                raise
             print(f"Error: File '{csv_file}' not found!")
         except Exception as e:
+            if strict:
+                raise ValueError(f"Malformed puzzle file '{csv_file}': {e}") from e
             print(f"Error reading CSV file: {e}")
     
+    def validate(self):
+        """
+        Raises ValueError unless the board size is positive, every vehicle
+        has a unique id, an orientation of 'H' or 'V' and a positive
+        length, the vehicles and walls lie on the board without
+        overlapping, and the red car 'X' is present.
+        """
+        if self.board_height < 1 or self.board_width < 1:
+            raise ValueError(f"Invalid board size {self.board_height}x{self.board_width}")
+        
+        occupied = {}
+        def place(x, y, name):
+            if not (0 <= x < self.board_width and 0 <= y < self.board_height):
+                raise ValueError(f"{name} is off the board at ({x}, {y})")
+            if (x, y) in occupied:
+                raise ValueError(f"{name} overlaps {occupied[(x, y)]} at ({x}, {y})")
+            occupied[(x, y)] = name
+        
+        for wall_x, wall_y in self.walls:
+            place(wall_x, wall_y, "Wall")
+        
+        ids = set()
+        for vehicle in self.vehicles:
+            vid = vehicle['id']
+            if vid in ids:
+                raise ValueError(f"Duplicate vehicle id '{vid}'")
+            ids.add(vid)
+            if vehicle['orientation'] not in ('H', 'V'):
+                raise ValueError(f"Vehicle '{vid}' has orientation '{vehicle['orientation']}' (expected 'H' or 'V')")
+            if vehicle['length'] < 1:
+                raise ValueError(f"Vehicle '{vid}' has length {vehicle['length']}")
+            for x, y in self.vehicleCells(vehicle):
+                place(x, y, f"Vehicle '{vid}'")
+        
+        if 'X' not in ids:
+            raise ValueError("No red car 'X'")
+    
     def setBoard(self):
         
         # Initialize empty board with '.' characters
@@ -84,16 +147,74 @@ class RushHourPuzzle:
     
     def isGoal(self):
         # Find the red car 'X'
-        for vehicle in self.vehicles:
-            # middle right is the exit position
-            if vehicle['id'] == 'X':
-                target_x = self.board_width - 2
-                target_y = self.board_height // 2 - 1
-                
-                # Check if X car is at the exit position
-                return vehicle['x'] == target_x and vehicle['y'] == target_y
+        index = self.vehicle_index.get('X')
+        if index is None:
+            return False
+        
+        # middle right is the exit position
+        vehicle = self.vehicles[index]
+        target_x = self.board_width - 2
+        target_y = self.board_height // 2 - 1
+        
+        # Check if X car is at the exit position
+        return vehicle['x'] == target_x and vehicle['y'] == target_y
+    
+    def applyAction(self, action):
+        """
+        Returns the state reached by an action: (vehicle_id, direction)
+        for a one-cell move, or (vehicle_id, direction, distance) for a
+        multi-cell slide.
+        """
+        vid, direction = action[0], action[1]
+        distance = action[2] if len(action) > 2 else 1
+        dx, dy = self.DIRECTIONS[direction]
         
-        return False
+        if vid not in self.vehicle_index:
+            raise ValueError(f"No vehicle '{vid}' in this puzzle")
+        return self.moveVehicle(self.vehicle_index[vid], dx * distance, dy * distance)
+    
+    def moveVehicle(self, index, dx, dy):
+        """
+        Returns a new state with vehicle `index` shifted by (dx, dy).
+        Only the moved vehicle's dict is copied; the other vehicles and
+        the walls are shared with this state (states never mutate them).
+        
+        The board is updated incrementally: only the rows the vehicle
+        touches are copied, and only the vacated and newly occupied cells
+        are rewritten instead of calling setBoard().
+        """
+        vehicle = self.vehicles[index]
+        new_vehicles = list(self.vehicles)
+        moved = dict(vehicle)
+        moved['x'] += dx
+        moved['y'] += dy
+        new_vehicles[index] = moved
+        
+        old_cells = self.vehicleCells(vehicle)
+        new_cells = self.vehicleCells(moved)
+        
+        board = list(self.board)
+        for y in {y for _, y in old_cells} | {y for _, y in new_cells}:
+            board[y] = list(board[y])
+        for x, y in old_cells:
+            board[y][x] = '.'
+        for x, y in new_cells:
+            board[y][x] = vehicle['id']
+        
+        return RushHourPuzzle(
+            vehicles=new_vehicles,
+            board_height=self.board_height,
+            board_width=self.board_width,
+            walls=self.walls,
+            board=board,
+            vehicle_index=self.vehicle_index
+        )
+    
+    def vehicleCells(self, vehicle):
+        # (x, y) cells covered by a vehicle
+        if vehicle['orientation'] == 'H':
+            return [(vehicle['x'] + i, vehicle['y']) for i in range(vehicle['length'])]
+        return [(vehicle['x'], vehicle['y'] + i) for i in range(vehicle['length'])]
     
     def successorFunction(self):
        # Generate all possible successor states from the current state
@@ -111,71 +232,21 @@ class RushHourPuzzle:
                 
                 # Try moving LEFT
                 if x > 0 and self.board[y][x - 1] == '.':
-                    # Create new vehicle list with updated position
-                    new_vehicles = copy.deepcopy(self.vehicles)
-                    new_vehicles[i]['x'] = x - 1
-                    
-                    # Create successor state
-                    successor_state = RushHourPuzzle(
-                        vehicles=new_vehicles,
-                        board_height=self.board_height,
-                        board_width=self.board_width
-                    )
-                    # Copy the walls into the new state
-                    successor_state.walls = copy.deepcopy(self.walls)
-                    # Rebuild the board with the walls included
-                    successor_state.setBoard()                    
-                    successors.append(((vid, 'L'), successor_state))
+                    successors.append(((vid, 'L'), self.moveVehicle(i, -1, 0)))
                 
                 # Try moving RIGHT
                 if x + length < self.board_width and self.board[y][x + length] == '.':
-                    new_vehicles = copy.deepcopy(self.vehicles)
-                    new_vehicles[i]['x'] = x + 1
-                    
-                    successor_state = RushHourPuzzle(
-                        vehicles=new_vehicles,
-                        board_height=self.board_height,
-                        board_width=self.board_width
-                    )
-                    # Copy the walls into the new state
-                    successor_state.walls = copy.deepcopy(self.walls)
-                    # Rebuild the board with the walls included
-                    successor_state.setBoard()                    
-                    successors.append(((vid, 'R'), successor_state))
+                    successors.append(((vid, 'R'), self.moveVehicle(i, 1, 0)))
             
             else:  # Vertical vehicle
                
                 # Try moving UP
                 if y > 0 and self.board[y - 1][x] == '.':
-                    new_vehicles = copy.deepcopy(self.vehicles)
-                    new_vehicles[i]['y'] = y - 1
-                    
-                    successor_state = RushHourPuzzle(
-                        vehicles=new_vehicles,
-                        board_height=self.board_height,
-                        board_width=self.board_width
-                    )
-                    # Copy the walls into the new state
-                    successor_state.walls = copy.deepcopy(self.walls)
-                    # Rebuild the board with the walls included
-                    successor_state.setBoard()                    
-                    successors.append(((vid, 'U'), successor_state))
+                    successors.append(((vid, 'U'), self.moveVehicle(i, 0, -1)))
                 
                 # Try moving DOWN
                 if y + length < self.board_height and self.board[y + length][x] == '.':
-                    new_vehicles = copy.deepcopy(self.vehicles)
-                    new_vehicles[i]['y'] = y + 1
-                    
-                    successor_state = RushHourPuzzle(
-                        vehicles=new_vehicles,
-                        board_height=self.board_height,
-                        board_width=self.board_width
-                    )
-                    # Copy the walls into the new state
-                    successor_state.walls = copy.deepcopy(self.walls)
-                    # Rebuild the board with the walls included
-                    successor_state.setBoard()                    
-                    successors.append(((vid, 'D'), successor_state))
+                    successors.append(((vid, 'D'), self.moveVehicle(i, 0, 1)))
         
         return successors
     
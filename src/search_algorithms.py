@@ -1,35 +1,97 @@
-from collections import deque
 import heapq
-from node import Node
+import time
+from collections import OrderedDict, deque
+from node import NodeArena
 from rush_hour_puzzle import RushHourPuzzle 
+from puzzle_spec import make_spec, compact, MutableBoard
+from open_lists import make_open_list
+from budget import SOLVED, EXCEEDED, UNSOLVABLE
 
-def BFS(initial_state, max_nodes=100000):
-    """Best BFS implementation combining all good features."""
+def BFS(initial_state, max_nodes=100000, engine='grid', slides=False, telemetry=None,
+        profiler=None, budget=None):
+    """
+    Best BFS implementation combining all good features.
+    
+    engine selects the move generator: 'grid' or 'bitboard'.
+    slides=True makes any multi-cell slide a single action, so the
+    solution minimizes the number of slides instead of cell moves.
+    telemetry (see telemetry.py) receives progress snapshots; profiler
+    (see profiler.py) times successor generation, keys and queue operations.
+    budget (see budget.py) limits time and memory; when it runs out, its
+    best_node is the last node expanded (the deepest layer reached).
+    """
+    
+    # The search runs on compact states (tuples of positions) that share
+    # one PuzzleSpec; sets hold exact packed int keys, computed once per state.
+    # The search tree lives in a NodeArena; only the open list holds states
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
     
-    open_list = deque()
+    open_list = deque()  # (arena index, state, key)
     closed_set = set()
     open_set = set()
     
-    init_node = Node(initial_state, None, None)
+    arena = NodeArena()
+    init_index = arena.add()
+    
+    # Hot-path calls, timed per phase when profiling
+    successors_of, next_key = spec.successors, spec.next_key
+    push, pop = open_list.append, open_list.popleft
+    if profiler is not None:
+        successors_of = profiler.wrap('successors', successors_of)
+        next_key = profiler.wrap('key', next_key)
+        push = profiler.wrap('queue', push)
+        pop = profiler.wrap('queue', pop)
+    
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+    
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("BFS")
+        report_at = telemetry.interval
     
-    if initial_state.isGoal():
+    if spec.is_goal(start):
         print("BFS: Initial state is goal!")
-        return init_node, 0
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return arena.getNode(init_index, spec, start), 0
     
-    # Use canonical_key for reliability
-    init_key = initial_state.canonical_key()
-    open_list.append(init_node)
-    open_set.add(init_key)
+    push((init_index, start, start_key))
+    open_set.add(start_key)
     
     steps = 0
+    generated = 0
+    
+    def snapshot():
+        # Every successor is either a new node in the arena or a duplicate
+        depth = arena.g(current)
+        return (steps, generated, generated - (len(arena) - 1),
+                len(open_list), len(closed_set), depth, depth)
     
     while open_list:
-        # Progress every 1000 nodes
-        if steps > 0 and steps % 1000 == 0:
-            print(f"BFS: {steps} nodes | open list size: {len(open_list)}")
+        if steps == report_at:
+            telemetry.update(*snapshot())
+            report_at += telemetry.interval
+        
+        if steps == check_at:
+            check_at += budget.interval
+            reason = budget.exceeded(len(open_list) + len(closed_set))
+            if reason:
+                print(f"BFS: Budget exceeded ({reason}) after {steps} steps")
+                if telemetry is not None:
+                    telemetry.finish(EXCEEDED, *snapshot())
+                budget.finish(EXCEEDED, reason, arena.getNode(current, spec, start))
+                return None, steps
         
-        current = open_list.popleft()
-        current_key = current.state.canonical_key()
+        current, current_state, current_key = pop()
         
         open_set.discard(current_key)
         closed_set.add(current_key)
@@ -38,74 +100,269 @@ def BFS(initial_state, max_nodes=100000):
         # Safety limit
         if steps > max_nodes:
             print(f"BFS: Max nodes ({max_nodes}) reached. Try A*!")
+            if telemetry is not None:
+                telemetry.finish('max_nodes', *snapshot())
+            if budget is not None:
+                budget.finish(EXCEEDED, 'max_nodes', arena.getNode(current, spec, start))
             return None, steps
         
-        for action, successor_state in current.state.successorFunction():
-            child = Node(successor_state, current, action)
-            child_key = successor_state.canonical_key()
+        successors = successors_of(current_state)
+        generated += len(successors)
+        for action, successor_state in successors:
+            child_key = next_key(current_key, action)
             
             if child_key in closed_set or child_key in open_set:
                 continue
             
-            if successor_state.isGoal():
+            child = arena.add(current, action)
+            
+            if spec.is_goal(successor_state):
                 print(f"BFS: Solution in {steps} steps!")
-                return child, steps
+                if telemetry is not None:
+                    telemetry.finish('solved', *snapshot())
+                if budget is not None:
+                    budget.finish(SOLVED)
+                return arena.getNode(child, spec, start), steps
             
-            open_list.append(child)
+            push((child, successor_state, child_key))
             open_set.add(child_key)
     
     print("BFS: No solution found!")
+    if telemetry is not None:
+        telemetry.finish('unsolved', *snapshot())
+    if budget is not None:
+        budget.finish(UNSOLVABLE)
     return None, steps
 
-def heuristic_h1(state):
+def bidirectional_BFS(initial_state, max_nodes=1000000, engine='grid', slides=False, telemetry=None,
+                      budget=None, max_goal_states=10000):
     """
-    Heuristic 1: Distance from red car 'X' to the exit.
+    Bidirectional BFS: searches forward from the initial state and backward
+    from every goal state (X at the exit, all consistent arrangements of
+    the other vehicles) one whole layer at a time, always growing the
+    smaller frontier. Moves are reversible, so the backward search uses the
+    same successor function.
+    
+    Only goal arrangements keeping the start's lane orders are seeded, but
+    the goal set can still dwarf the forward search (2-a: 123,178 goal
+    states for a 541,934-state cluster that BFS solves in 18,558
+    expansions). Seeding costs about as much as expanding as many states,
+    so on the bundled examples, whose clusters are small, bidirectional
+    BFS is no faster than BFS. With more than max_goal_states goal
+    states, it searches forward only.
+    
+    When a layer reaches states seen by the other side, the layer is
+    finished and the cheapest meeting point is kept, so the solution is
+    optimal. telemetry (see telemetry.py) receives progress snapshots.
+    budget (see budget.py) limits time and memory; when it runs out, its
+    best_node leads to the forward frontier (the deepest layer reached
+    from the initial state).
+    
+    Returns:
+    - goal_node: Node chain from the initial state to a goal, or None
+    - steps: Number of nodes expanded (both directions)
     """
-    # Find the red car 'X'
-    for vehicle in state.vehicles:
-        if vehicle['id'] == 'X':
-            # Use same exit as isGoal: leftmost x position for X should be board_width - 2
-            target_x = state.board_width - 2
-            current_x = vehicle['x']
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
+    
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+    
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("BiBFS")
+        report_at = telemetry.interval
+    
+    if spec.is_goal(start):
+        print("BiBFS: Initial state is goal!")
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return spec.materialize(spec.replay(start, [])), 0
+    
+    # key -> (neighbour key toward the root of that side, action, depth)
+    # Backward actions are stored inverted, i.e. pointing toward the goal
+    forward_seen = {start_key: (None, None, 0)}
+    backward_seen = {}
+    forward_frontier = [(start, start_key)]
+    backward_frontier = []
+    
+    # Goal arrangements keeping the start's lane orders (the others are
+    # unreachable). Past max_goal_states, seeding and growing the backward
+    # side costs more than it saves: search forward only, testing goals
+    forward_only = False
+    for goal in spec.goal_states(start):
+        if len(backward_frontier) == max_goal_states:
+            forward_only = True
+            print(f"BiBFS: More than {max_goal_states} goal states, searching forward only")
+            backward_seen.clear()
+            backward_frontier.clear()
+            break
+        goal_key = spec.pack(goal)
+        backward_seen[goal_key] = (None, None, 0)
+        backward_frontier.append((goal, goal_key))
+    
+    def forward_path(key):
+        """Actions from the initial state to a state seen forward."""
+        actions = []
+        while forward_seen[key][0] is not None:
+            parent_key, action, _ = forward_seen[key]
+            actions.append(action)
+            key = parent_key
+        actions.reverse()
+        return actions
+    
+    steps = 0
+    generated = 0
+    roots = 1 + len(backward_seen)
+    
+    def snapshot():
+        # Every successor is either newly seen by its side or a duplicate
+        known = len(forward_seen) + len(backward_seen)
+        depth = seen[key][2] if steps else 0
+        return (steps, generated, generated - (known - roots),
+                len(forward_frontier) + len(backward_frontier), known, depth, depth)
+    
+    while forward_frontier and (backward_frontier or forward_only):
+        # Grow the smaller side by one full layer
+        forward = forward_only or len(forward_frontier) <= len(backward_frontier)
+        if forward:
+            frontier, seen, other = forward_frontier, forward_seen, backward_seen
+        else:
+            frontier, seen, other = backward_frontier, backward_seen, forward_seen
+        
+        next_frontier = []
+        best_meeting = None
+        best_cost = None
+        
+        for state, key in frontier:
+            if steps == report_at:
+                telemetry.update(*snapshot())
+                report_at += telemetry.interval
             
-            # Distance to exit (number of left/right moves needed)
-            distance = target_x - current_x
-            return max(0, distance)  # Never negative
+            if steps == check_at:
+                check_at += budget.interval
+                reason = budget.exceeded(len(forward_seen) + len(backward_seen))
+                if reason:
+                    print(f"BiBFS: Budget exceeded ({reason}) after {steps} steps")
+                    if telemetry is not None:
+                        telemetry.finish(EXCEEDED, *snapshot())
+                    deepest = spec.replay(start, forward_path(forward_frontier[-1][1]))
+                    budget.finish(EXCEEDED, reason, spec.materialize(deepest))
+                    return None, steps
+            
+            steps += 1
+            if steps > max_nodes:
+                print(f"BiBFS: Max nodes ({max_nodes}) reached.")
+                if telemetry is not None:
+                    telemetry.finish('max_nodes', *snapshot())
+                if budget is not None:
+                    deepest = spec.replay(start, forward_path(forward_frontier[-1][1]))
+                    budget.finish(EXCEEDED, 'max_nodes', spec.materialize(deepest))
+                return None, steps
+            
+            depth = seen[key][2] + 1
+            successors = spec.successors(state)
+            generated += len(successors)
+            for action, successor_state in successors:
+                child_key = spec.next_key(key, action)
+                if child_key in seen:
+                    continue
+                
+                if not forward:
+                    action = spec.inverse(action)
+                seen[child_key] = (key, action, depth)
+                next_frontier.append((successor_state, child_key))
+                
+                if child_key in other:
+                    cost = depth + other[child_key][2]
+                    if best_cost is None or cost < best_cost:
+                        best_meeting, best_cost = child_key, cost
+                elif forward_only and best_meeting is None and spec.is_goal(successor_state):
+                    best_meeting, best_cost = child_key, depth
+        
+        if best_meeting is not None:
+            print(f"BiBFS: Solution in {steps} steps!")
+            if telemetry is not None:
+                telemetry.finish('solved', *snapshot())
+            if budget is not None:
+                budget.finish(SOLVED)
+            
+            # Initial state -> meeting point
+            actions = forward_path(best_meeting)
+            
+            # Meeting point -> goal
+            key = best_meeting
+            while key in backward_seen and backward_seen[key][0] is not None:
+                next_key, action, _ = backward_seen[key]
+                actions.append(action)
+                key = next_key
+            
+            return spec.materialize(spec.replay(start, actions)), steps
+        
+        if forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
     
-    return 0
+    print("BiBFS: No solution found!")
+    if telemetry is not None:
+        telemetry.finish('unsolved', *snapshot())
+    if budget is not None:
+        budget.finish(UNSOLVABLE)
+    return None, steps
+
+def heuristic_h1(state, spec=None):
+    """
+    Heuristic 1: Distance from red car 'X' to the exit.
+    
+    Accepts a RushHourPuzzle, or a compact state together with its spec.
+    """
+    if spec is None:
+        spec, state = compact(state)
+    
+    if spec.x_index is None:
+        return 0
+    
+    # Use same exit as isGoal: leftmost x position for X should be board_width - 2
+    target_x = spec.board_width - 2
+    red = spec.x_index
+    current_x = state[red] if spec.orientations[red] == 'H' else spec.lanes[red]
+    
+    # Distance to exit (number of left/right moves needed)
+    distance = target_x - current_x
+    
+    # With slides X can cover the whole distance in one action
+    if spec.slides:
+        distance = min(distance, 1)
+    
+    return max(0, distance)  # Never negative
 
 
-def heuristic_h2(state):
+def heuristic_h2(state, spec=None):
     """
     Heuristic 2: h1 + number of blocking vehicles.
     """
-    h1 = heuristic_h1(state)
+    if spec is None:
+        spec, state = compact(state)
     
-    # Find the red car
-    red_car = None
-    for vehicle in state.vehicles:
-        if vehicle['id'] == 'X':
-            red_car = vehicle
-            break
+    h1 = heuristic_h1(state, spec)
     
-    if not red_car:
+    if spec.x_index is None:
         return h1
     
-    # Count blocking vehicles (using a set to avoid double-counting)
-    blocking_vehicles = set()
-    red_y = red_car['y']
-    # right-end index of red car (first cell to the right is red_x_end)
-    red_x_end = red_car['x'] + red_car['length']
-    # check every cell to the board edge (cells that must be cleared)
-    for x in range(red_x_end, state.board_width):
-        cell = state.board[red_y][x]
-        if cell != '.' and cell != '#' and cell != 'X':
-            blocking_vehicles.add(cell)
-    
-    return h1 + len(blocking_vehicles)
+    # Count blocking vehicles: every cell from the right end of the red car
+    # to the board edge must be cleared
+    return h1 + len(spec.blockers(state, spec.board_width))
 
 
-def heuristic_h3(state):
+def heuristic_h3(state, spec=None):
     """
     Heuristic 3: Enhanced heuristic considering blocking vehicles 
     and their mobility (proposed third heuristic).
@@ -115,175 +372,932 @@ def heuristic_h3(state):
     - Vehicles that are harder to move (blocked themselves)
     - Secondary blockers (vehicles blocking the primary blockers)
     """
-    h2_value = heuristic_h2(state)
+    if spec is None:
+        spec, state = compact(state)
     
-    # Find the red car
-    red_car = None
-    for vehicle in state.vehicles:
-        if vehicle['id'] == 'X':
-            red_car = vehicle
-            break
+    h2_value = heuristic_h2(state, spec)
     
-    if not red_car:
+    if spec.x_index is None:
         return h2_value
     
     # Additional penalty for deeply blocked vehicles
     penalty = 0
-    red_y = red_car['y']
-    red_x_end = red_car['x'] + red_car['length']
-    target_x = state.board_width - 1
-    
-    # Find all blocking vehicles
-    blocking_vehicle_ids = set()
-    for x in range(red_x_end, target_x):
-        if x < state.board_width:
-            cell = state.board[red_y][x]
-            if cell != '.' and cell != '#' and cell != 'X':
-                blocking_vehicle_ids.add(cell)
-    
-    # Check blocking vehicles and their mobility
-    for blocking_id in blocking_vehicle_ids:
-        # Find this blocking vehicle
-        for vehicle in state.vehicles:
-            if vehicle['id'] == blocking_id:
-                if vehicle['orientation'] == 'V':
-                    # Vertical vehicle blocking horizontal path
-                    # Check if it can move up or down
-                    can_move_up = (vehicle['y'] > 0 and 
-                                 state.board[vehicle['y'] - 1][vehicle['x']] == '.')
-                    can_move_down = (vehicle['y'] + vehicle['length'] < state.board_height and 
-                                   state.board[vehicle['y'] + vehicle['length']][vehicle['x']] == '.')
-                    
-                    if not (can_move_up or can_move_down):
-                        # Vehicle is stuck, add higher penalty
-                        penalty += 3
-                    elif not can_move_up or not can_move_down:
-                        # Vehicle can only move one direction
-                        penalty += 1
-                
-                elif vehicle['orientation'] == 'H':
-                    # Horizontal vehicle blocking (shouldn't happen but check anyway)
-                    can_move_left = (vehicle['x'] > 0 and 
-                                   state.board[vehicle['y']][vehicle['x'] - 1] == '.')
-                    can_move_right = (vehicle['x'] + vehicle['length'] < state.board_width and 
-                                    state.board[vehicle['y']][vehicle['x'] + vehicle['length']] == '.')
-                    
-                    if not (can_move_left or can_move_right):
-                        penalty += 3
-                    elif not can_move_left or not can_move_right:
-                        penalty += 1
-                break
+    occupancy = spec.occupancy(state)
+    
+    # Check blocking vehicles (up to the last column) and their mobility:
+    # up/down for vertical blockers, left/right for horizontal ones
+    for i in spec.blockers(state, spec.board_width - 1):
+        can_move_back, can_move_forward = spec.mobility(occupancy, i, state[i])
+        
+        if not (can_move_back or can_move_forward):
+            # Vehicle is stuck, add higher penalty
+            penalty += 3
+        elif not can_move_back or not can_move_forward:
+            # Vehicle can only move one direction
+            penalty += 1
     
     return h2_value + penalty
 
-##changed 
-def A_star(initial_state, heuristic_function=heuristic_h1):
+
+
+def clearing_moves(spec, state, i, lo, hi):
+    """
+    The ways vehicle i can get out of the cells lo..hi of its own lane
+    (positions along its axis): for each direction where the bounds and
+    the walls allow it, (distance, first, last) with the lane cells
+    first..last it has to pass through.
+    """
+    pos = state[i]
+    length = spec.lengths[i]
+    base = spec.bases[i]
+    stride = spec.strides[i]
+    walls = spec.empty_grid
+    moves = []
+    
+    # Back: its last cell ends up before lo
+    new_pos = lo - length
+    if new_pos < pos:
+        if new_pos >= 0 and all(walls[base + k * stride] != '#' for k in range(new_pos, pos)):
+            moves.append((pos - new_pos, new_pos, pos - 1))
+    else:
+        moves.append((0, pos, pos - 1))
+    
+    # Forward: its first cell ends up after hi
+    new_pos = hi + 1
+    if new_pos > pos:
+        last = new_pos + length - 1
+        if last < spec.limits[i] and all(walls[base + k * stride] != '#'
+                                         for k in range(pos + length, last + 1)):
+            moves.append((new_pos - pos, pos + length, last))
+    else:
+        moves.append((0, pos, pos - 1))
+    
+    return moves
+
+
+def clearing_cost(spec, state, grid, i, lo, hi, depth, counted):
+    """
+    Lower bound on the moves needed to get vehicle i out of the cells
+    lo..hi of its lane, including (for depth > 1) the vehicles standing
+    where it has to go, recursively.
+    
+    A lower bound stays admissible as long as every vehicle's moves are
+    counted at most once: the vehicles in its way are all counted (they
+    are distinct), but only the most expensive of their own chains is
+    added, and vehicles already in `counted` are skipped.
+    
+    Returns: The bound, or None if i can never leave those cells
+    """
+    best = None
+    for distance, first, last in clearing_moves(spec, state, i, lo, hi):
+        # With slides, any distance is a single move
+        cost = min(distance, 1) if spec.slides else distance
+        
+        if depth > 1 and distance > 0:
+            base = spec.bases[i]
+            stride = spec.strides[i]
+            in_way = []
+            for k in range(first, last + 1):
+                occupant = grid[base + k * stride]
+                if occupant != '.' and occupant != '#':
+                    j = spec.index[occupant]
+                    if j not in counted and j not in in_way:
+                        in_way.append(j)
+            
+            inner_counted = counted | {i} | set(in_way)
+            extra = 0
+            for j in in_way:
+                # Cells of i's path on j's lane: a parallel vehicle shares
+                # i's axis, a perpendicular one crosses i's lane once
+                if spec.orientations[j] == spec.orientations[i]:
+                    j_lo, j_hi = first, last
+                else:
+                    j_lo = j_hi = spec.lanes[i]
+                own = clearing_cost(spec, state, grid, j, j_lo, j_hi, 1, inner_counted)
+                chain = clearing_cost(spec, state, grid, j, j_lo, j_hi, depth - 1, inner_counted)
+                if own is None or chain is None:
+                    cost = None
+                    break
+                cost += own
+                extra = max(extra, chain - own)
+            if cost is None:
+                continue
+            cost += extra
+        
+        if best is None or cost < best:
+            best = cost
+    return best
+
+
+def blocker_bound(state, spec=None, depth=2):
+    """
+    Admissible lower bound: X's distance to the exit, plus for every
+    vehicle blocking X's row the fewest moves that get it out of the row
+    (walls and board edges included), plus the most expensive chain of
+    vehicles in the way of a blocker, up to `depth` levels.
+    
+    Each single-cell move moves one vehicle by one cell, so summing
+    per-vehicle distances of distinct vehicles never overestimates.
+    States where a blocker (or X) can never clear the row get a large
+    value, since they cannot reach the goal at all.
+    
+    Depths 1 and 2 were also consistent on every state sampled from the
+    example clusters; deeper chains stay admissible but can drop by more
+    than 1 along a move, which A* (no reopening of closed states) does
+    not tolerate.
+    """
+    if spec is None:
+        spec, state = compact(state)
+    
+    h1 = heuristic_h1(state, spec)
+    if spec.goal_position is None:
+        return h1
+    
+    dead_end = spec.board_width * spec.board_height * len(spec.ids)
+    grid = spec.grid(state)
+    xi = spec.x_index
+    row = spec.lanes[xi]
+    x_end = state[xi] + spec.lengths[xi]
+    
+    if any(grid[row * spec.board_width + x] == '#' for x in range(x_end, spec.board_width)):
+        return dead_end
+    
+    primaries = spec.blockers(state, spec.board_width)
+    counted = {xi} | set(primaries)
+    total = h1
+    extra = 0
+    for i in primaries:
+        if spec.orientations[i] == 'H':
+            # In X's own row: it can never let X through
+            return dead_end
+        own = clearing_cost(spec, state, grid, i, row, row, 1, counted)
+        chain = clearing_cost(spec, state, grid, i, row, row, depth, counted)
+        if own is None or chain is None:
+            return dead_end
+        total += own
+        extra = max(extra, chain - own)
+    
+    return total + extra
+
+
+def heuristic_h4(state, spec=None):
+    """
+    Heuristic 4 (admissible): h1 + fewest moves to clear every blocker
+    out of X's row.
+    """
+    return blocker_bound(state, spec, depth=1)
+
+
+def heuristic_h5(state, spec=None):
+    """
+    Heuristic 5 (admissible): h4 + the vehicles in the way of the
+    blockers (blockers of blockers), two levels deep.
+    """
+    return blocker_bound(state, spec, depth=2)
+
+class HeuristicMemo:
+    """
+    Bounded memo of heuristic values keyed by packed state key, evicting
+    the least recently used entries. Worth it when the same states are
+    evaluated again: decrease-key in A*, or several searches sharing one
+    memo for puzzles of the same layout. Sharing only pays off if the
+    memo holds the earlier search's states: one search evaluating more
+    states than max_entries evicts its first ones in order, before the
+    next search asks for them again (two A* (h2) runs on 2-a: 0 hits with
+    1,000 entries, 6,371 of 6,371 with 65,536).
+    
+    The memo is tied to one layout and move model (spec fingerprint); it
+    is cleared when used with another one. hits and misses count the
+    current search only.
+    """
+    
+    def __init__(self, heuristic_function, max_entries=1 << 20):
+        self.heuristic_function = heuristic_function
+        self.max_entries = max_entries
+        self.values = OrderedDict()
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+    
+    def bind(self, spec):
+        """Prepare the memo for a search on spec's layout."""
+        self.hits = 0
+        self.misses = 0
+        fingerprint = spec.fingerprint()
+        if fingerprint != self.fingerprint:
+            self.values.clear()
+            self.fingerprint = fingerprint
+    
+    def evaluate(self, state, key, spec):
+        """Returns h(state), computed only if key is not memoized."""
+        values = self.values
+        value = values.get(key)
+        if value is not None:
+            self.hits += 1
+            values.move_to_end(key)
+            return value
+        
+        self.misses += 1
+        value = self.heuristic_function(state, spec)
+        values[key] = value
+        if len(values) > self.max_entries:
+            values.popitem(last=False)
+        return value
+    
+    def report(self):
+        """Returns a one-line hit/miss summary."""
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        return f"{self.hits:,} hits, {self.misses:,} misses ({rate:.1f}% hit rate)"
+
+
+def make_heuristic(heuristic_function, heuristic_memo, spec):
+    """
+    Returns (evaluate, memo) for a search: evaluate(state, key) gives h.
+    
+    heuristic_memo is None (no memo), a maximum number of entries for a
+    new HeuristicMemo, or a HeuristicMemo to reuse.
+    """
+    if heuristic_memo is None:
+        return (lambda state, key: heuristic_function(state, spec)), None
+    
+    if not isinstance(heuristic_memo, HeuristicMemo):
+        heuristic_memo = HeuristicMemo(heuristic_function, heuristic_memo)
+    heuristic_memo.bind(spec)
+    return (lambda state, key: heuristic_memo.evaluate(state, key, spec)), heuristic_memo
+
+
+def A_star(initial_state, heuristic_function=heuristic_h1, engine='grid', slides=False,
+           open_list='heap', heuristic_memo=None, telemetry=None, profiler=None, budget=None,
+           weight=1):
     """
     A* Search algorithm following the course pseudocode (Figure 1.29).
     Uses a heuristic function to guide the search.
     
+    With weight > 1 it is weighted A* (f = g + weight * h): fewer nodes,
+    and with a consistent heuristic the solution costs at most weight
+    times the optimal cost.
+    
     Parameters:
     - initial_state: RushHourPuzzle instance
     - heuristic_function: Function to estimate cost to goal
+    - engine: Move generator, 'grid' or 'bitboard'
+    - slides: Count any multi-cell slide as a single action
+    - open_list: Open list implementation, 'heap', 'bucket' or 'indexed'
+      (see open_lists.py), or an open list instance
+    - heuristic_memo: None, a memo size, or a HeuristicMemo (e.g. shared
+      between searches) to cache h by packed state key
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py)
+    - profiler: PhaseProfiler timing successor generation, keys, heuristic
+      evaluations and open list operations (see profiler.py)
+    - budget: Budget limiting time and memory (see budget.py); when it
+      runs out, its best_node is the node with the lowest h generated
+    - weight: Factor applied to h (1: plain A*; the 'bucket' open list
+      needs an integer weight)
     
     Returns:
     - goal_node: Node containing the goal state, or None
     - steps: Number of nodes expanded
     """
+    # Compact states (tuples of positions) sharing one PuzzleSpec; Closed
+    # and Open are keyed by exact packed keys, so distinct states never merge.
+    # The search tree lives in a NodeArena; only the open list holds states
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    arena = NodeArena()
+    heuristic, memo = make_heuristic(heuristic_function, heuristic_memo, spec)
+    
     # Open: priorityQueue /* Ordered queue by f */
-    open_list = []
+    # Keyed by packed state key; items are (arena index, state)
+    open_list = make_open_list(open_list)
     
     # Closed: set for O(1) lookup
     closed_set = set()
     
-    # For tracking nodes in open list (for efficient lookup and updates)
-    open_dict = {}  # Maps state_hash -> node
+    # Hot-path calls, timed per phase when profiling
+    successors_of, next_key = spec.successors, spec.next_key
+    push, pop = open_list.push, open_list.pop
+    if profiler is not None:
+        successors_of = profiler.wrap('successors', successors_of)
+        next_key = profiler.wrap('key', next_key)
+        heuristic = profiler.wrap('heuristic', heuristic)
+        push = profiler.wrap('queue', push)
+        pop = profiler.wrap('queue', pop)
     
-    # Counter to break ties in priority queue (ensures FIFO for equal f-values)
-    counter = 0
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+    
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("A*")
+        report_at = telemetry.interval
     
     # init_node <- Node (s, None, None)
-    init_node = Node(initial_state, None, None)
+    init_node = arena.add()
+    init_key = spec.pack(start)
     
     # init_node.f <- h(init_node)
-    init_node.setF(heuristic_function)
+    init_f = heuristic(start, init_key)
+    
+    # Closest node to a goal so far (partial result if the budget runs out)
+    best, best_h = init_node, init_f
     
     # if (isGoal(init_node.state)) then return init_node
-    if initial_state.isGoal():
+    if spec.is_goal(start):
         print("A*: Initial state is goal!")
-        return init_node, 0
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, weight * init_f, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return arena.getNode(init_node, spec, start), 0
     
     # Open.insert(init_node)
-    heapq.heappush(open_list, (init_node.f, counter, init_node))
-    counter += 1
-    open_dict[hash(init_node.state)] = init_node
+    push(init_key, weight * init_f, 0, (init_node, start))
     
     steps = 0
+    generated = 0
+    
+    def snapshot():
+        # Successors that did not add a node reached a known state
+        g = arena.g(current)
+        return (steps, generated, generated - (len(arena) - 1),
+                len(open_list), len(closed_set), g + weight * heuristic_function(current_state, spec), g)
     
     # while (not Open.empty()) do
-    while open_list:
-        # Show progress every 1000 nodes
-        if steps > 0 and steps % 1000 == 0:
-            print(f"A*: Expanded {steps} nodes, open list size: {len(open_list)}")
-        
+    while len(open_list):
         # current <- Open.dequeue() /* Remove node with lowest f */
-        _, _, current = heapq.heappop(open_list)
-        current_hash = hash(current.state)
+        current_key, (current, current_state) = pop()
         
-        # Skip if this state was already processed (can happen with duplicates in heap)
-        if current_hash in closed_set:
-            continue
+        if steps == report_at:
+            telemetry.update(*snapshot())
+            report_at += telemetry.interval
         
-        # Remove from open_dict
-        if current_hash in open_dict:
-            del open_dict[current_hash]
+        if steps == check_at:
+            check_at += budget.interval
+            reason = budget.exceeded(len(open_list) + len(closed_set))
+            if reason:
+                print(f"A*: Budget exceeded ({reason}) after {steps} steps, best h {best_h}")
+                if telemetry is not None:
+                    telemetry.finish(EXCEEDED, *snapshot())
+                budget.finish(EXCEEDED, reason, arena.getNode(best, spec, start), best_h)
+                return None, steps
         
         # if (isGoal(current.state)) then return current
-        if current.state.isGoal():
+        if spec.is_goal(current_state):
             print(f"A*: Solution found in {steps} steps!")
-            return current, steps
+            if memo:
+                print(f"A*: Heuristic memo: {memo.report()}")
+            if telemetry is not None:
+                telemetry.finish('solved', *snapshot())
+            if budget is not None:
+                budget.finish(SOLVED)
+            return arena.getNode(current, spec, start), steps
         
         # Closed.add(current)
-        closed_set.add(current_hash)
+        closed_set.add(current_key)
         steps += 1
+        child_g = arena.g(current) + 1
         
         # for each (action, successor) in successorsFn(current.state) do
-        for action, successor_state in current.state.successorFunction():
-            # child <- Node (successor, current, action)
-            child = Node(successor_state, current, action)
-            
-            # child.f <- child.g + h(child)
-            child.setF(heuristic_function)
-            
-            child_hash = hash(child.state)
+        successors = successors_of(current_state)
+        generated += len(successors)
+        for action, successor_state in successors:
+            child_key = next_key(current_key, action)
             
             # Skip if already in closed set
-            if child_hash in closed_set:
+            if child_key in closed_set:
                 continue
             
             # if (child.state not in Open) then
-            if child_hash not in open_dict:
+            if child_key not in open_list:
+                # child <- Node (successor, current, action)
+                child = arena.add(current, action)
+                
+                # child.f <- child.g + h(child)
+                child_h = heuristic(successor_state, child_key)
+                child_f = child_g + weight * child_h
+                if child_h < best_h:
+                    best, best_h = child, child_h
+                
                 # Open.insert(child)
-                heapq.heappush(open_list, (child.f, counter, child))
-                counter += 1
-                open_dict[child_hash] = child
+                push(child_key, child_f, child_g, (child, successor_state))
             
             # else if (child.state in Open with a higher value of f) then
             else:
-                old_node = open_dict[child_hash]
+                old_node, _ = open_list.get(child_key)
                 # Replace if we found a better path
-                if child.g < old_node.g:
+                if child_g < arena.g(old_node):
                     # Update the existing node with better path
-                    old_node.g = child.g
-                    old_node.parent = child.parent
-                    old_node.action = child.action
-                    old_node.setF(heuristic_function)
+                    arena.update(old_node, current, action)
+                    child_f = child_g + weight * heuristic(successor_state, child_key)
                     
-                    # Add updated node back to heap
-                    # (old entry still in heap but will be skipped due to closed set check)
-                    heapq.heappush(open_list, (old_node.f, counter, old_node))
-                    counter += 1
+                    # Lower its priority in Open (decrease-key, or a new
+                    # entry that supersedes the old one, depending on the open list)
+                    push(child_key, child_f, child_g, (old_node, successor_state))
     
     # return None
     print("A*: No solution found!")
-    return None, steps
\ No newline at end of file
+    if telemetry is not None:
+        telemetry.finish('unsolved', *snapshot())
+    if budget is not None:
+        budget.finish(UNSOLVABLE)
+    return None, steps
+
+
+def ARA_star(initial_state, heuristic_function=heuristic_h1, weights=(5, 3, 2, 1.5, 1),
+             engine='grid', slides=False, heuristic_memo=None, telemetry=None, budget=None,
+             on_incumbent=None):
+    """
+    Anytime Repairing A* (ARA*): a series of weighted A* searches
+    (f = g + w * h) with decreasing weights that reuse each other's work.
+    The first, nearly greedy search finds a solution quickly; each later
+    search only re-expands the states whose g improved after they were
+    expanded (kept in INCONS), and lowers the solution cost toward optimal.
+    
+    After each search the incumbent (best solution so far) is reported
+    with its suboptimality bound: min(w, cost / min(g + h)) over the
+    states still open or inconsistent, so that, with a consistent
+    heuristic, cost <= bound * optimal cost. A bound of 1 proves the
+    incumbent optimal and ends the search early.
+    
+    Parameters:
+    - initial_state: RushHourPuzzle instance
+    - heuristic_function: Function to estimate cost to goal
+    - weights: Decreasing weights, one search each (end with 1 for an
+      optimal final answer)
+    - engine: Move generator, 'grid' or 'bitboard'
+    - slides: Count any multi-cell slide as a single action
+    - heuristic_memo: None, a memo size, or a HeuristicMemo
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py);
+      the final one has the incumbent's cost as f and g
+    - budget: Budget limiting time and memory (see budget.py); when it
+      runs out, the incumbent is returned (budget.status is SOLVED, with
+      budget.reason telling why the search stopped early)
+    - on_incumbent: Function called for every new incumbent with a
+      dictionary: cost, bound, weight, steps, time, actions
+    
+    Returns:
+    - goal_node: Node containing the best goal found, or None
+    - steps: Number of nodes expanded (all searches)
+    """
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
+    arena = NodeArena()
+    heuristic, memo = make_heuristic(heuristic_function, heuristic_memo, spec)
+    start_time = time.perf_counter()
+    
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+    
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("ARA*")
+        report_at = telemetry.interval
+    
+    if spec.is_goal(start):
+        print("ARA*: Initial state is goal!")
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return spec.materialize(spec.replay(start, [])), 0
+    
+    nodes = {start_key: arena.add()}  # key -> arena index, every state generated
+    h_values = {start_key: heuristic(start, start_key)}
+    open_states = {start_key: start}  # OPEN: key -> state
+    incons = {}                       # INCONS: improved after their expansion
+    closed = set()
+    heap = []                         # (f, counter, key), stale entries skipped
+    counter = 0
+    
+    incumbent = None                  # Arena index of the best goal found
+    cost = float('inf')
+    bound = None
+    steps = 0
+    generated = 0
+    reason = None
+    
+    def snapshot(f, g):
+        # Successors that did not add a node reached a known state
+        return (steps, generated, generated - (len(nodes) - 1),
+                len(open_states), len(closed), f, g)
+    
+    def improve_path(weight):
+        """One weighted A* search, until no open state can beat the incumbent."""
+        nonlocal counter, incumbent, cost, steps, generated, check_at, report_at, reason
+        
+        while heap:
+            f, _, key = heap[0]
+            state = open_states.get(key)
+            if state is None or f != arena.g(nodes[key]) + weight * h_values[key]:
+                heapq.heappop(heap)
+                continue
+            if f >= cost:
+                return
+            
+            if steps == report_at:
+                telemetry.update(*snapshot(f, arena.g(nodes[key])))
+                report_at += telemetry.interval
+            
+            if steps == check_at:
+                check_at += budget.interval
+                reason = budget.exceeded(len(nodes))
+                if reason:
+                    return
+            
+            heapq.heappop(heap)
+            del open_states[key]
+            closed.add(key)
+            steps += 1
+            
+            index = nodes[key]
+            child_g = arena.g(index) + 1
+            successors = spec.successors(state)
+            generated += len(successors)
+            for action, child_state in successors:
+                child_key = spec.next_key(key, action)
+                child = nodes.get(child_key)
+                if child is None:
+                    child = nodes[child_key] = arena.add(index, action)
+                    h_values[child_key] = heuristic(child_state, child_key)
+                elif child_g < arena.g(child):
+                    arena.update(child, index, action)
+                else:
+                    continue
+                
+                if spec.is_goal(child_state):
+                    if child_g < cost:
+                        incumbent, cost = child, child_g
+                    continue
+                
+                # Cannot lead to a solution cheaper than the incumbent
+                if child_g + h_values[child_key] >= cost:
+                    continue
+                
+                if child_key in closed:
+                    incons[child_key] = child_state
+                else:
+                    open_states[child_key] = child_state
+                    heapq.heappush(heap, (child_g + weight * h_values[child_key], counter, child_key))
+                    counter += 1
+    
+    for n, weight in enumerate(weights):
+        if n == 0:
+            heap.append((weight * h_values[start_key], counter, start_key))
+            counter += 1
+        else:
+            # Next search: inconsistent states are open again, with the new f
+            open_states.update(incons)
+            incons.clear()
+            closed.clear()
+            heap[:] = [(arena.g(nodes[key]) + weight * h_values[key], i, key)
+                       for i, key in enumerate(open_states)]
+            heapq.heapify(heap)
+            counter = len(heap)
+        
+        previous = (cost, bound)
+        improve_path(weight)
+        
+        if incumbent is None:
+            if reason or not open_states:
+                break
+            continue
+        
+        # Improving one of its ancestors may have shortened the incumbent
+        cost = len(arena.getSolution(incumbent))
+        
+        lowest = min((arena.g(nodes[key]) + h_values[key]
+                      for states in (open_states, incons) for key in states), default=cost)
+        # cost / lowest always holds; weight only once its search completed
+        limit = bound if reason else weight
+        bound = max(1, cost / lowest if limit is None else min(limit, cost / lowest))
+        if (cost, bound) != previous:
+            elapsed_time = time.perf_counter() - start_time
+            print(f"ARA*: w={weight:g} | cost {cost} | bound {bound:.3f} | "
+                  f"{steps} steps | {elapsed_time:.3f}s")
+            if on_incumbent is not None:
+                on_incumbent({
+                    'cost': cost,
+                    'bound': bound,
+                    'weight': weight,
+                    'steps': steps,
+                    'time': elapsed_time,
+                    'actions': arena.getSolution(incumbent)
+                })
+        
+        if reason or bound == 1:
+            break
+    
+    if incumbent is None:
+        if reason:
+            print(f"ARA*: Budget exceeded ({reason}) after {steps} steps, no solution yet")
+            if telemetry is not None:
+                telemetry.finish(EXCEEDED, *snapshot(None, None))
+            budget.finish(EXCEEDED, reason)
+        else:
+            print("ARA*: No solution found!")
+            if telemetry is not None:
+                telemetry.finish('unsolved', *snapshot(None, None))
+            if budget is not None:
+                budget.finish(UNSOLVABLE)
+        return None, steps
+    
+    if reason:
+        print(f"ARA*: Budget exceeded ({reason}), returning the incumbent")
+    print(f"ARA*: Solution found in {steps} steps (cost {cost}, bound {bound:g})!")
+    if memo:
+        print(f"ARA*: Heuristic memo: {memo.report()}")
+    if telemetry is not None:
+        telemetry.finish('solved', *snapshot(cost, cost))
+    if budget is not None:
+        budget.finish(SOLVED, reason)
+    return arena.getNode(incumbent, spec, start), steps
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table for IDA*. Each entry holds, for one
+    state:
+    - the smallest g at which it was reached (kept across iterations: a
+      shorter path found once is searched again in every later iteration,
+      so the state is cut off when reached at a larger g)
+    - the iteration in which it was last entered at that g, so it is also
+      cut off when reached again at the same g in the same iteration
+    - a learned lower bound on its cost to the goal (after a bounded
+      search below it returned t, no solution from it costs less than
+      t - g), which keeps improving h across iterations
+    
+    Slots are preallocated in buckets of two, indexed by a Fibonacci hash
+    of the packed key (plain key % size would only see the first vehicles'
+    bit fields), so memory stays flat.
+    Replacement policy: a new key takes an empty slot of its bucket, else
+    the entry from the oldest iteration, entered at the largest g. That
+    entry is overwritten if it comes from an older iteration or was
+    entered at the same or a larger g than the new one (shallow entries
+    guard bigger subtrees); otherwise it is kept. Two ways per bucket stop
+    colliding states from evicting each other in turn, which would make
+    IDA* search their subtrees again every time.
+    """
+    
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.buckets = max(1, size // 2)
+        self.keys = [None] * size
+        self.g_values = [0] * size
+        self.iterations = [0] * size
+        self.bounds = [0] * size
+        self.hits = 0
+        self.replacements = 0
+    
+    def slot(self, key):
+        """Returns the first slot index of the bucket of a packed key."""
+        return ((hash(key) * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) >> 32) % self.buckets * 2
+    
+    def lookup(self, key):
+        """Returns the slot holding key, or None if key is not in the table."""
+        slot = self.slot(key)
+        keys = self.keys
+        if keys[slot] == key:
+            self.hits += 1
+            return slot
+        if slot + 1 < self.size and keys[slot + 1] == key:
+            self.hits += 1
+            return slot + 1
+        return None
+    
+    def store(self, key, g, iteration, bound):
+        """Record key (if the replacement policy allows)."""
+        slot = self.slot(key)
+        other = slot + 1
+        if self.keys[slot] not in (key, None) and other < self.size:
+            if self.keys[other] in (key, None) or (
+                    (self.iterations[other], -self.g_values[other])
+                    < (self.iterations[slot], -self.g_values[slot])):
+                slot = other
+        
+        old_key = self.keys[slot]
+        if old_key is not None and old_key != key:
+            if self.iterations[slot] == iteration and self.g_values[slot] < g:
+                return
+            self.replacements += 1
+        self.keys[slot] = key
+        self.g_values[slot] = g
+        self.iterations[slot] = iteration
+        self.bounds[slot] = bound
+
+
+def IDA_star(initial_state, heuristic_function=heuristic_h1, table_size=1 << 16,
+             engine='grid', slides=False, heuristic_memo=None, telemetry=None, profiler=None,
+             budget=None):
+    """
+    Iterative Deepening A*: depth-first searches bounded by f = g + h, with
+    the bound raised to the smallest f that exceeded it until a goal is
+    found. Runs on one MutableBoard (moves applied and undone in place) and
+    a fixed-size TranspositionTable, so memory does not grow with the
+    number of expanded nodes.
+    
+    With an admissible heuristic (h1, h2) the solution cost equals A*'s.
+    It trades time for memory: every iteration searches again the states
+    within its bound (h2 starts far below the solution cost, so 2-b takes
+    99 iterations), and states evicted from the table, or reached at a
+    smaller g than before, are searched again too.
+    
+    Parameters:
+    - initial_state: RushHourPuzzle instance
+    - heuristic_function: Function to estimate cost to goal
+    - table_size: Number of transposition table slots
+    - engine: Move generator, 'grid' or 'bitboard'
+    - slides: Count any multi-cell slide as a single action
+    - heuristic_memo: None, a memo size, or a HeuristicMemo; the table
+      already keeps h of the states it holds, so a memo only helps once
+      states are evicted (its entries count in the budget's memory)
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py);
+      open is the current path length (there is no closed list), f the
+      bound, and duplicates counts transposition cutoffs
+    - profiler: PhaseProfiler timing move generation, keys and heuristic
+      evaluations (see profiler.py)
+    - budget: Budget limiting time and memory (see budget.py; memory is
+      the transposition table, so only a ceiling below it stops the
+      search); when it runs out, its best_node is the lowest-h node seen
+    
+    Returns:
+    - goal_node: Node containing the goal state, or None
+    - steps: Number of nodes expanded (all iterations)
+    """
+    spec = make_spec(initial_state, engine, slides)
+    start = spec.encode(initial_state)
+    board = MutableBoard(spec, start)
+    table = TranspositionTable(table_size)
+    heuristic, memo = make_heuristic(heuristic_function, heuristic_memo, spec)
+    
+    # Hot-path calls, timed per phase when profiling
+    legal_moves, next_key = board.legal_moves, spec.next_key
+    if profiler is not None:
+        legal_moves = profiler.wrap('successors', legal_moves)
+        next_key = profiler.wrap('key', next_key)
+        heuristic = profiler.wrap('heuristic', heuristic)
+    
+    path = []       # Actions from the initial state to the current board
+    steps = 0
+    generated = 0
+    duplicates = 0
+    iteration = 0
+    found = -1      # Sentinel returned by search() when a goal is reached
+    stopped = -2    # Sentinel returned by search() when the budget runs out
+    reason = None
+    next_threshold = float('inf')  # Smallest f above the bound this iteration
+    
+    # Lowest-h node seen (partial result if the budget runs out)
+    best_h = heuristic(start, spec.pack(start))
+    best_path = []
+    
+    # Expansion count of the next budget check (-1: never)
+    check_at = -1
+    if budget is not None:
+        budget.start()
+        check_at = budget.interval
+    
+    # Expansion count of the next snapshot (-1: never)
+    report_at = -1
+    if telemetry is not None:
+        telemetry.start("IDA*")
+        report_at = telemetry.interval
+    
+    def snapshot(threshold):
+        return (steps, generated, duplicates, len(path), None, threshold, len(path))
+    
+    def search(key, g, threshold, slot):
+        """
+        Search below the current board, whose packed key is `key` and
+        transposition table slot `slot` (or None), looked up by the caller.
+        
+        Returns found, stopped, or a lower bound on the cost of a solution
+        through this node (g plus a lower bound on its cost to the goal).
+        """
+        nonlocal steps, generated, duplicates, report_at, check_at, reason, best_h, best_path
+        nonlocal next_threshold
+        
+        if slot is not None:
+            h = table.bounds[slot]
+        else:
+            h = heuristic(board.state(), key)
+            if h < best_h:
+                best_h, best_path = h, path[:]
+        
+        f = g + h
+        if f > threshold:
+            if f < next_threshold:
+                next_threshold = f
+            # Remember g and h, but not as entered in this iteration
+            table.store(key, g, iteration - 1, h)
+            return f
+        
+        if board.is_goal():
+            return found
+        table.store(key, g, iteration, h)
+        
+        if steps == report_at:
+            telemetry.update(*snapshot(threshold))
+            report_at += telemetry.interval
+        if steps == check_at:
+            check_at += budget.interval
+            reason = budget.exceeded(table.size + len(path) + (len(memo.values) if memo else 0))
+            if reason:
+                return stopped
+        steps += 1
+        
+        minimum = float('inf')
+        child_g = g + 1
+        moves = legal_moves()
+        generated += len(moves)
+        for action in moves:
+            # Known children are checked before touching the board
+            child_key = next_key(key, action)
+            child_slot = table.lookup(child_key)
+            if child_slot is not None:
+                t = child_g + table.bounds[child_slot]
+                
+                # Transposition: the state was reached at a smaller g (in
+                # any iteration; that shorter path is searched again in
+                # every later one), or already searched at this g in this
+                # iteration. Solutions through it from here cost at least
+                # as much as from there, and its frontier is already (or
+                # will be) in next_threshold; its learned bound still holds
+                if table.g_values[child_slot] < child_g or (
+                        table.g_values[child_slot] == child_g
+                        and table.iterations[child_slot] == iteration):
+                    duplicates += 1
+                    if t < minimum:
+                        minimum = t
+                    continue
+                
+                # Learned bound already above the threshold
+                if t > threshold:
+                    if t < next_threshold:
+                        next_threshold = t
+                    table.store(child_key, child_g, iteration - 1, t - child_g)
+                    if t < minimum:
+                        minimum = t
+                    continue
+            
+            board.apply(action)
+            path.append(action)
+            
+            t = search(child_key, child_g, threshold, child_slot)
+            if t == found or t == stopped:
+                return t
+            
+            path.pop()
+            board.undo()
+            if t < minimum:
+                minimum = t
+        
+        # No solution from this node costs less than minimum - g
+        if minimum - g > h:
+            h = minimum - g
+        table.store(key, g, iteration, h)
+        return g + h
+    
+    threshold = best_h
+    
+    while True:
+        iteration += 1
+        next_threshold = float('inf')
+        start_key = spec.pack(start)
+        t = search(start_key, 0, threshold, table.lookup(start_key))
+        
+        if t == found:
+            print(f"IDA*: Solution found in {steps} steps ({iteration} iterations)!")
+            if memo:
+                print(f"IDA*: Heuristic memo: {memo.report()}")
+            if telemetry is not None:
+                telemetry.finish('solved', *snapshot(threshold))
+            if budget is not None:
+                budget.finish(SOLVED)
+            return spec.materialize(spec.replay(start, path)), steps
+        
+        if t == stopped:
+            print(f"IDA*: Budget exceeded ({reason}) after {steps} steps, best h {best_h}")
+            if telemetry is not None:
+                telemetry.finish(EXCEEDED, *snapshot(threshold))
+            budget.finish(EXCEEDED, reason, spec.materialize(spec.replay(start, best_path)), best_h)
+            return None, steps
+        
+        if next_threshold == float('inf'):
+            print("IDA*: No solution found!")
+            if telemetry is not None:
+                telemetry.finish('unsolved', *snapshot(threshold))
+            if budget is not None:
+                budget.finish(UNSOLVABLE)
+            return None, steps
+        
+        threshold = next_threshold
@@ -0,0 +1,94 @@
+import json
+import sqlite3
+import time
+
+from puzzle_spec import PuzzleSpec
+
+
+class SolutionCache:
+    """
+    Persistent solution cache stored in a local SQLite file.
+
+    Entries map (puzzle layout fingerprint + packed initial state, solver)
+    to the solution actions, nodes expanded and search time of a previous
+    run. The cache holds at most max_entries solutions; the least recently
+    used ones are evicted first.
+    """
+
+    def __init__(self, path='.solution_cache.sqlite', max_entries=1000):
+        """
+        Parameters:
+        - path: SQLite file (created if missing)
+        - max_entries: Maximum number of cached solutions
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            " key TEXT PRIMARY KEY,"
+            " actions TEXT NOT NULL,"
+            " steps INTEGER NOT NULL,"
+            " time REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(puzzle, solver):
+        """
+        Returns the cache key of a puzzle for a solver description (e.g.
+        algorithm, heuristic and options). The puzzle part is exact: its
+        layout fingerprint plus its packed state.
+        """
+        spec = PuzzleSpec(puzzle)
+        return f"{spec.fingerprint()}:{spec.pack(spec.encode(puzzle))}:{solver}"
+
+    def get(self, puzzle, solver):
+        """
+        Look up a cached solution.
+
+        Returns: Dictionary with 'actions', 'steps' and 'time', or None
+        """
+        key = self.make_key(puzzle, solver)
+        row = self.connection.execute(
+            "SELECT actions, steps, time FROM solutions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.connection.execute(
+            "UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key)
+        )
+        self.connection.commit()
+
+        actions, steps, elapsed_time = row
+        return {
+            'actions': [tuple(action) for action in json.loads(actions)],
+            'steps': steps,
+            'time': elapsed_time
+        }
+
+    def put(self, puzzle, solver, actions, steps, elapsed_time):
+        """
+        Store a solution, then evict the least recently used entries beyond
+        max_entries.
+        """
+        key = self.make_key(puzzle, solver)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions (key, actions, steps, time, last_used)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(actions), steps, elapsed_time, time.time())
+        )
+        self.connection.execute(
+            "DELETE FROM solutions WHERE key NOT IN"
+            " (SELECT key FROM solutions ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self.connection.commit()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,54 @@
+from puzzle_spec import PuzzleSpec
+
+
+class SolutionPath:
+    """
+    The states of a solution, produced on demand from the initial state
+    and the action list instead of being kept alive by the search tree.
+
+    path[i] is the state after the first i actions. States are rebuilt by
+    replaying actions from the nearest cached state (forward, or backward
+    with the inverse actions), and only the cache_size states closest to
+    the last one requested are kept, so stepping LEFT/RIGHT costs one
+    action each.
+    """
+
+    def __init__(self, initial_state, actions, cache_size=16):
+        """
+        Parameters:
+        - initial_state: RushHourPuzzle the actions start from
+        - actions: List of (vehicle_id, direction[, distance]) tuples
+        - cache_size: Number of states kept around the current index
+        """
+        self.initial_state = initial_state
+        self.actions = list(actions)
+        self.cache_size = cache_size
+        self.cache = {0: initial_state}
+
+    def __len__(self):
+        return len(self.actions) + 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("solution path index out of range")
+
+        state = self.cache.get(index)
+        if state is None:
+            nearest = min(self.cache, key=lambda i: abs(i - index))
+            state = self.cache[nearest]
+            if nearest < index:
+                for action in self.actions[nearest:index]:
+                    state = state.applyAction(action)
+            else:
+                for action in reversed(self.actions[index:nearest]):
+                    state = state.applyAction(PuzzleSpec.inverse(action))
+            self.cache[index] = state
+
+        # Keep the initial state and the states closest to this index
+        while len(self.cache) > self.cache_size:
+            farthest = max((i for i in self.cache if i != 0), key=lambda i: abs(i - index))
+            del self.cache[farthest]
+
+        return state
@@ -0,0 +1,112 @@
+import json
+import time
+
+
+class Telemetry:
+    """
+    Observer of a search's progress. A search given a Telemetry calls
+    start() once, update() every `interval` expansions (at most once per
+    layer for the layer-by-layer BFS variants) and finish() on every way
+    out (solved, unsolved, node limit or budget); each call hands over a
+    snapshot dictionary:
+
+    - algorithm, elapsed (seconds since start)
+    - expanded, generated (successors produced), duplicates (successors
+      dropped because their state was already known)
+    - open, closed: sizes of the search's structures (None if it has none)
+    - f, g: of the node being expanded (or the current bound and depth)
+    - status: only in the last snapshot ('solved', 'unsolved', 'max_nodes'
+      or 'budget_exceeded')
+
+    Subclasses decide what to do with the snapshots in emit(). Searches
+    get telemetry=None by default and then skip reporting entirely.
+    """
+
+    def __init__(self, interval=1000):
+        """
+        Parameters:
+        - interval: Expansions between two snapshots (at least 1)
+
+        Raises ValueError for a smaller interval.
+        """
+        if interval < 1:
+            raise ValueError(f"Telemetry interval must be at least 1, got {interval}")
+        self.interval = interval
+        self.algorithm = None
+        self.start_time = None
+
+    def start(self, algorithm):
+        self.algorithm = algorithm
+        self.start_time = time.perf_counter()
+
+    def snapshot(self, expanded, generated, duplicates, open_size, closed_size, f, g):
+        return {
+            'algorithm': self.algorithm,
+            'elapsed': time.perf_counter() - self.start_time,
+            'expanded': expanded,
+            'generated': generated,
+            'duplicates': duplicates,
+            'open': open_size,
+            'closed': closed_size,
+            'f': f,
+            'g': g
+        }
+
+    def update(self, expanded, generated, duplicates, open_size, closed_size, f, g):
+        self.emit(self.snapshot(expanded, generated, duplicates, open_size, closed_size, f, g))
+
+    def finish(self, status, expanded, generated, duplicates, open_size, closed_size, f, g):
+        snapshot = self.snapshot(expanded, generated, duplicates, open_size, closed_size, f, g)
+        snapshot['status'] = status
+        self.emit(snapshot)
+
+    def emit(self, snapshot):
+        pass
+
+
+class SilentTelemetry(Telemetry):
+    """Keeps the snapshots in a list (e.g. to plot them) and prints nothing."""
+
+    def __init__(self, interval=1000):
+        super().__init__(interval)
+        self.snapshots = []
+
+    def emit(self, snapshot):
+        self.snapshots.append(snapshot)
+
+
+class PrintTelemetry(Telemetry):
+    """Prints one human-readable line per snapshot."""
+
+    def emit(self, snapshot):
+        def number(value):
+            return f"{value:,}" if value is not None else "-"
+
+        status = f" [{snapshot['status']}]" if 'status' in snapshot else ""
+        print(f"{snapshot['algorithm']}: {snapshot['expanded']:,} expanded | "
+              f"{snapshot['generated']:,} generated | {snapshot['duplicates']:,} duplicates | "
+              f"open {number(snapshot['open'])} | closed {number(snapshot['closed'])} | "
+              f"f {number(snapshot['f'])} g {number(snapshot['g'])} | "
+              f"{snapshot['elapsed']:.2f}s{status}")
+
+
+class JsonlTelemetry(Telemetry):
+    """Writes one JSON object per snapshot (JSON Lines) to a file or path."""
+
+    def __init__(self, file, interval=1000):
+        """
+        Parameters:
+        - file: Open text file, or a path (opened for appending)
+        - interval: Expansions between two snapshots
+        """
+        super().__init__(interval)
+        self.owns_file = isinstance(file, str)
+        self.file = open(file, 'a') if self.owns_file else file
+
+    def emit(self, snapshot):
+        self.file.write(json.dumps(snapshot) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
@@ -0,0 +1,206 @@
+from puzzle_spec import BitboardSpec
+from budget import SOLVED, EXCEEDED, UNSOLVABLE
+
+# NumPy is optional: without it the other solvers still work
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+def vectorized_BFS(initial_state, max_nodes=10000000, slides=False, telemetry=None, budget=None):
+    """
+    Level-synchronous BFS on NumPy arrays of packed states.
+
+    Each layer is a sorted uint64 array of packed keys. All successors of a
+    layer are generated at once, vehicle by vehicle and direction by
+    direction, with the bitboard masks of BitboardSpec; duplicates are
+    removed with np.unique and np.isin. Every layer keeps, for each of its
+    states, the parent key and the move (vehicle index and signed
+    distance), so the solution is rebuilt by walking back through the
+    layers with np.searchsorted.
+
+    Parameters:
+    - initial_state: RushHourPuzzle instance
+    - max_nodes: Stop after expanding this many states
+    - slides: Count any multi-cell slide as a single action
+    - telemetry: Telemetry receiving progress snapshots (see telemetry.py),
+      at most one per layer, once `interval` expansions have passed since
+      the previous one; f and g are the layer's depth
+    - budget: Budget limiting time and memory (see budget.py), checked once
+      per layer; memory is the size of the layer arrays. When it runs out,
+      its best_node leads to a state of the deepest layer
+
+    Returns:
+    - goal_node: Node containing the goal state, or None
+    - steps: Number of states expanded (whole layers)
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("vectorized_BFS needs NumPy: pip install numpy")
+
+    spec = BitboardSpec(initial_state, slides)
+    vehicles = len(spec.ids)
+    bits = max(spec.board_width, spec.board_height).bit_length()
+    if bits * vehicles > 64 or spec.board_width * spec.board_height > 64:
+        raise ValueError("Puzzle too large for 64-bit packed states and bitboards")
+
+    start = spec.encode(initial_state)
+    start_key = spec.pack(start)
+    if budget is not None:
+        budget.start()
+    # Expansion count of the next snapshot
+    report_at = 0
+    if telemetry is not None:
+        telemetry.start("BFS (NumPy)")
+        report_at = telemetry.interval
+    if spec.is_goal(start):
+        print("BFS (NumPy): Initial state is goal!")
+        if telemetry is not None:
+            telemetry.finish('solved', 0, 0, 0, 0, 0, 0, 0)
+        if budget is not None:
+            budget.finish(SOLVED)
+        return spec.materialize(spec.replay(start, [])), 0
+
+    field_mask = np.uint64((1 << bits) - 1)
+    shifts = [np.uint64(shift) for shift in spec.shifts]
+    masks = [np.array(vehicle_masks, dtype=np.uint64) for vehicle_masks in spec.masks]
+    cells = [np.array([1 << (spec.bases[i] + k * spec.strides[i]) for k in range(spec.limits[i])],
+                      dtype=np.uint64)
+             for i in range(vehicles)]
+    wall_mask = np.uint64(spec.wall_mask)
+
+    # Each layer: (sorted keys, parent keys, vehicle indices, signed distances)
+    empty = np.array([], dtype=np.uint64)
+    layers = [(np.array([start_key], dtype=np.uint64), empty,
+               np.array([], dtype=np.int8), np.array([], dtype=np.int8))]
+    goal_key = None
+    steps = 0
+    generated = 0
+    known = 1  # States in all layers
+
+    def snapshot():
+        # The last layer is the open one; successors that did not make it
+        # into a layer were duplicates
+        depth = len(layers) - 1
+        frontier_size = len(layers[-1][0])
+        return (steps, generated, generated - (known - 1),
+                frontier_size, known - frontier_size, depth, depth)
+
+    def walk_back(key):
+        # Actions from the start to a state of the last layer, through
+        # the layers' predecessor arrays
+        actions = []
+        for keys, parent_keys, moved, distances in reversed(layers[1:]):
+            j = np.searchsorted(keys, key)
+            i = int(moved[j])
+            distance = int(distances[j])
+            back, forward = spec.directions[i]
+            direction = back if distance < 0 else forward
+            actions.append((spec.ids[i], direction, abs(distance)) if slides else (spec.ids[i], direction))
+            key = parent_keys[j]
+        actions.reverse()
+        return actions
+
+    while goal_key is None:
+        frontier = layers[-1][0]
+        steps += len(frontier)
+        reason = 'max_nodes' if steps > max_nodes else None
+        if budget is not None and reason is None:
+            reason = budget.exceeded(memory=sum(array.nbytes for layer in layers for array in layer))
+        if reason:
+            if reason == 'max_nodes':
+                print(f"BFS (NumPy): Max nodes ({max_nodes}) reached.")
+            else:
+                print(f"BFS (NumPy): Budget exceeded ({reason}) after {steps} steps")
+            if telemetry is not None:
+                telemetry.finish('max_nodes' if reason == 'max_nodes' else EXCEEDED, *snapshot())
+            if budget is not None:
+                partial = spec.replay(start, walk_back(frontier[0]))
+                budget.finish(EXCEEDED, reason, spec.materialize(partial))
+            return None, steps
+
+        positions = [((frontier >> shifts[i]) & field_mask).astype(np.intp)
+                     for i in range(vehicles)]
+        occupied = np.full(len(frontier), wall_mask, dtype=np.uint64)
+        for i in range(vehicles):
+            occupied |= masks[i][positions[i]]
+
+        children, parents, moved, distances = [], [], [], []
+        for i in range(vehicles):
+            pos = positions[i]
+            limit = spec.limits[i]
+            unit = np.uint64(1 << spec.shifts[i])
+
+            for sign in (-1, 1):
+                # Cell that must be free to move `distance` cells this way
+                edge = pos - 1 if sign < 0 else pos + spec.lengths[i]
+                movable = np.ones(len(frontier), dtype=bool)
+                distance = 1
+                while True:
+                    target = edge + sign * (distance - 1)
+                    movable &= (target >= 0) & (target < limit)
+                    movable &= (occupied & cells[i][np.clip(target, 0, limit - 1)]) == 0
+                    selected = np.nonzero(movable)[0]
+                    if len(selected) == 0:
+                        break
+
+                    step = unit * np.uint64(distance)
+                    parent_keys = frontier[selected]
+                    children.append(parent_keys - step if sign < 0 else parent_keys + step)
+                    parents.append(parent_keys)
+                    moved.append(np.full(len(selected), i, dtype=np.int8))
+                    distances.append(np.full(len(selected), sign * distance, dtype=np.int8))
+
+                    if not slides:
+                        break
+                    distance += 1
+
+        if not children:
+            break
+
+        children = np.concatenate(children)
+        generated += len(children)
+        children, first = np.unique(children, return_index=True)
+        parents = np.concatenate(parents)[first]
+        moved = np.concatenate(moved)[first]
+        distances = np.concatenate(distances)[first]
+
+        # Moves are reversible, so a child of layer d is in layer d - 1, d
+        # or d + 1: only the last two layers need to be checked
+        new = ~np.isin(children, frontier, assume_unique=True)
+        if len(layers) > 1:
+            new &= ~np.isin(children, layers[-2][0], assume_unique=True)
+        if not new.any():
+            break
+
+        layer = (children[new], parents[new], moved[new], distances[new])
+        layers.append(layer)
+        known += len(layer[0])
+        if telemetry is not None and steps >= report_at:
+            telemetry.update(*snapshot())
+            report_at = steps + telemetry.interval
+
+        if spec.goal_position is not None:
+            x_positions = (layer[0] >> shifts[spec.x_index]) & field_mask
+            at_goal = np.nonzero(x_positions == np.uint64(spec.goal_position))[0]
+            if len(at_goal):
+                goal_key = layer[0][at_goal[0]]
+
+    if goal_key is None:
+        print("BFS (NumPy): No solution found!")
+        if telemetry is not None:
+            telemetry.finish('unsolved', *snapshot())
+        if budget is not None:
+            budget.finish(UNSOLVABLE)
+        return None, steps
+
+    actions = walk_back(goal_key)
+
+    print(f"BFS (NumPy): Solution in {steps} steps!")
+    if telemetry is not None:
+        telemetry.finish('solved', *snapshot())
+    if budget is not None:
+        budget.finish(SOLVED)
+    return spec.materialize(spec.replay(start, actions)), steps